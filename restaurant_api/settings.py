@@ -53,6 +53,28 @@ DATABASES = {
 
 AUTH_USER_MODEL = 'restaurant_app.User'
 
+# 'default' holds the catalog and model version counters and 'recommendations'
+# per-user recommendation results. Both are locmem by default; point a backend
+# at django.core.cache.backends.filebased.FileBasedCache (LOCATION = directory)
+# or django.core.cache.backends.db.DatabaseCache (LOCATION = table, then run
+# `manage.py createcachetable`) to share entries between workers. With more
+# than one worker 'default' must be shared, or a catalog edit only reaches the
+# worker that made it.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DEFAULT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DEFAULT_CACHE_LOCATION', ''),
+    },
+    'recommendations': {
+        'BACKEND': os.getenv('RECOMMENDATION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RECOMMENDATION_CACHE_LOCATION', 'recommendations'),
+        'TIMEOUT': int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', 600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RECOMMENDATION_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
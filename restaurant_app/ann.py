@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class RandomProjectionIndex:
+    """Approximate cosine nearest-neighbour index using random hyperplane LSH.
+
+    Every vector is hashed into ``n_tables`` codes of ``n_bits`` sign bits;
+    vectors at a small angle tend to share a code in at least one table. Each
+    table is stored as codes sorted alongside their row positions, so finding
+    a bucket is a binary search and a query touches only the rows in its
+    buckets instead of every row.
+    """
+
+    def __init__(self, n_features, n_tables=16, n_bits=8, seed=0):
+        rng = np.random.default_rng(seed)
+        self.n_features = n_features
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.planes = rng.standard_normal((n_features, n_tables * n_bits)).astype(np.float32)
+        self._bit_values = np.left_shift(np.uint64(1), np.arange(n_bits, dtype=np.uint64))
+        self._sorted_codes = None
+        self._sorted_rows = None
+
+    def hash(self, vectors):
+        """``(n_vectors, n_tables)`` array of bucket codes for sparse row vectors."""
+        vectors = vectors[:, :self.n_features]
+        if vectors.shape[1] < self.n_features:
+            vectors.resize((vectors.shape[0], self.n_features))
+        projected = np.asarray(vectors @ self.planes)
+        bits = (projected > 0).reshape(-1, self.n_tables, self.n_bits).astype(np.uint64)
+        return (bits * self._bit_values).sum(axis=2, dtype=np.uint64)
+
+    def fit(self, vectors):
+        codes = self.hash(vectors)
+        self._sorted_rows = np.argsort(codes, axis=0, kind='stable')
+        self._sorted_codes = np.take_along_axis(codes, self._sorted_rows, axis=0)
+        return self
+
+    def candidates(self, vector):
+        """Rows sharing a bucket with ``vector`` (a 1 x n sparse row) in any table."""
+        codes = self.hash(vector)[0]
+        rows = []
+        for table, code in enumerate(codes):
+            column = self._sorted_codes[:, table]
+            start = np.searchsorted(column, code, side='left')
+            stop = np.searchsorted(column, code, side='right')
+            rows.append(self._sorted_rows[start:stop, table])
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+
+def neighbor_recall(interactions, rows, k=5):
+    """Mean fraction of the exact top-``k`` users that the approximate search also finds."""
+    recalls = []
+    for row in rows:
+        exact, exact_similarities = interactions.nearest_users(row, k=k)
+        if not len(exact):
+            continue
+        _, approximate_similarities = interactions.nearest_users(row, k=k, approximate=True)
+        # Compare by similarity so ties at the k-th place don't count as misses
+        found = np.count_nonzero(approximate_similarities >= exact_similarities[-1] - 1e-6)
+        recalls.append(min(found, len(exact)) / len(exact))
+    return float(np.mean(recalls)) if recalls else 1.0
@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .conf import recommender_setting
+
+CURRENT_POINTER = 'CURRENT'
+
+
+def bundles_dir():
+    return os.path.join(recommender_setting('ARTIFACT_DIR'), 'bundles')
+
+
+def current_pointer_path():
+    return os.path.join(bundles_dir(), CURRENT_POINTER)
+
+
+class ArtifactBundle:
+    """A published, immutable directory of recommender arrays.
+
+    Every array is a separate ``.npy`` file opened with ``mmap_mode='r'`` on
+    first use, so worker processes share the operating system's page cache
+    copy instead of each holding their own. ``manifest.json`` lists the
+    arrays and per-model metadata.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = os.path.basename(path)
+        with open(os.path.join(path, 'manifest.json')) as manifest:
+            self.manifest = json.load(manifest)
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.manifest['arrays']
+
+    def array(self, name):
+        if name not in self._arrays:
+            with self._lock:
+                if name not in self._arrays:
+                    self._arrays[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def metadata(self, section):
+        return self.manifest['metadata'].get(section, {})
+
+
+def read_current_bundle():
+    """Open the currently published bundle from disk, or ``None`` if there is none."""
+    try:
+        with open(current_pointer_path()) as pointer:
+            version = pointer.read().strip()
+    except FileNotFoundError:
+        return None
+    return ArtifactBundle(os.path.join(bundles_dir(), version))
+
+
+def publish_bundle(arrays, metadata=None, keep=3):
+    """Publish ``arrays`` (``{name: ndarray}``) as the new current bundle.
+
+    Arrays of the current bundle that are not replaced are carried over, so
+    each offline job only has to supply what it rebuilt. The bundle is
+    written to a hidden staging directory, renamed into place and then made
+    current by atomically replacing the pointer file; readers see either the
+    old bundle or the complete new one. Only the newest ``keep`` bundles are
+    kept on disk.
+    """
+    root = bundles_dir()
+    os.makedirs(root, exist_ok=True)
+    current = read_current_bundle()
+
+    seconds, nanoseconds = divmod(time.time_ns(), 10 ** 9)
+    timestamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(seconds))
+    version = f'{timestamp}.{nanoseconds:09d}-{uuid.uuid4().hex[:8]}'
+    staging = os.path.join(root, f'.{version}')
+    os.makedirs(staging)
+
+    names = set(arrays)
+    merged_metadata = dict(current.manifest['metadata']) if current else {}
+    if current:
+        for name in current.manifest['arrays']:
+            if name in arrays:
+                continue
+            source = os.path.join(current.path, f'{name}.npy')
+            target = os.path.join(staging, f'{name}.npy')
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+            names.add(name)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+    merged_metadata.update(metadata or {})
+
+    with open(os.path.join(staging, 'manifest.json'), 'w') as manifest:
+        json.dump({'arrays': sorted(names), 'metadata': merged_metadata}, manifest)
+
+    path = os.path.join(root, version)
+    os.rename(staging, path)
+
+    pointer_staging = os.path.join(root, f'.{CURRENT_POINTER}-{version}')
+    with open(pointer_staging, 'w') as pointer:
+        pointer.write(version)
+        pointer.flush()
+        os.fsync(pointer.fileno())
+    os.replace(pointer_staging, current_pointer_path())
+
+    _prune_bundles(root, keep, version)
+    return ArtifactBundle(path)
+
+
+def _prune_bundles(root, keep, current):
+    # Versions start with a timestamp, so name order is publish order. Workers
+    # still mapping a removed bundle keep reading it until they reload.
+    versions = sorted(
+        name for name in os.listdir(root)
+        if not name.startswith('.') and name != CURRENT_POINTER
+    )
+    for name in versions[:-keep]:
+        if name == current:
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+_bundle = None
+_bundle_key = None
+_bundle_lock = threading.Lock()
+
+
+def get_artifact_bundle():
+    """The current bundle, reopened whenever a new one has been published.
+
+    Costs one ``stat`` of the pointer file per call; the bundle is only
+    reopened when the pointer was replaced, so a publish reaches every
+    worker on its next request without a restart.
+    """
+    global _bundle, _bundle_key
+
+    try:
+        stat = os.stat(current_pointer_path())
+    except FileNotFoundError:
+        return None
+
+    key = (stat.st_ino, stat.st_mtime_ns)
+    if key != _bundle_key:
+        with _bundle_lock:
+            if key != _bundle_key:
+                _bundle = read_current_bundle()
+                _bundle_key = key
+    return _bundle
+
+
+def reset_artifact_bundle():
+    global _bundle, _bundle_key
+
+    with _bundle_lock:
+        _bundle = None
+        _bundle_key = None
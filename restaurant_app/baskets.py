@@ -0,0 +1,220 @@
+from collections import Counter
+from itertools import permutations
+
+import numpy as np
+from scipy import sparse
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import FoodItemStats, ItemPairCount, OrderStats
+
+
+def basket_matrix(OrderItem, chunk_size=10000):
+    """``(order_ids, item_ids, baskets)``: a binary order x item CSR matrix."""
+    rows = np.fromiter(
+        (
+            value
+            for pair in OrderItem.objects.values_list('order_id', 'food_item_id').iterator(chunk_size=chunk_size)
+            for value in pair
+        ),
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+    order_ids, order_positions = np.unique(rows[:, 0], return_inverse=True)
+    item_ids, item_positions = np.unique(rows[:, 1], return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (order_positions, item_positions)),
+        shape=(len(order_ids), len(item_ids))
+    )
+    # An item listed twice in one order is still one basket
+    baskets.data[:] = 1
+    return order_ids, item_ids, baskets
+
+
+def co_occurrence(baskets):
+    """Item x item counts of shared baskets; the diagonal holds each item's basket count."""
+    return (baskets.T @ baskets).tocsr()
+
+
+def rebuild_item_pairs(OrderItem, ItemPairCount, FoodItemStats, OrderStats=None, chunk_size=10000):
+    """Recompute every pair count and basket count from the full order history.
+
+    The total basket count is reset too when ``OrderStats`` is given.
+    """
+    order_ids, item_ids, baskets = basket_matrix(OrderItem, chunk_size)
+    counts = co_occurrence(baskets).tocoo()
+    off_diagonal = counts.row != counts.col
+    basket_counts = np.asarray(baskets.sum(axis=0)).ravel()
+
+    with transaction.atomic():
+        ItemPairCount.objects.all().delete()
+        ItemPairCount.objects.bulk_create(
+            (
+                ItemPairCount(food_item_id=int(item_ids[row]), other_id=int(item_ids[col]), count=int(count))
+                for row, col, count in zip(
+                    counts.row[off_diagonal], counts.col[off_diagonal], counts.data[off_diagonal]
+                )
+            ),
+            batch_size=chunk_size
+        )
+        FoodItemStats.objects.update(basket_count=0)
+        FoodItemStats.objects.bulk_update(
+            [
+                FoodItemStats(food_item_id=item_id, basket_count=basket_count)
+                for item_id, basket_count in zip(item_ids.tolist(), basket_counts.tolist())
+            ],
+            ['basket_count'],
+            batch_size=chunk_size
+        )
+        if OrderStats is not None:
+            OrderStats.objects.update_or_create(pk=1, defaults={'basket_count': len(order_ids)})
+    return len(item_ids), int(off_diagonal.sum())
+
+
+def _increment_pairs(pair_counts):
+    """Add ``{(food_item_id, other_id): count}`` to the pair table in a fixed number of queries.
+
+    Existing pairs are bumped by a single ``UPDATE ... CASE`` of in-place
+    increments and missing ones inserted in bulk; a pair inserted
+    concurrently turns the insert into another round of updates.
+    """
+    pending = dict(pair_counts)
+    while pending:
+        item_ids = {food_item_id for food_item_id, _ in pending}
+        other_ids = {other_id for _, other_id in pending}
+        existing = [
+            ItemPairCount(pk=pk, count=F('count') + pending.pop((food_item_id, other_id)))
+            for pk, food_item_id, other_id in (
+                ItemPairCount.objects
+                .filter(food_item_id__in=item_ids, other_id__in=other_ids)
+                .values_list('pk', 'food_item_id', 'other_id')
+            )
+            if (food_item_id, other_id) in pending
+        ]
+        ItemPairCount.objects.bulk_update(existing, ['count'])
+        try:
+            with transaction.atomic():
+                ItemPairCount.objects.bulk_create(
+                    ItemPairCount(food_item_id=food_item_id, other_id=other_id, count=count)
+                    for (food_item_id, other_id), count in pending.items()
+                )
+        except IntegrityError:
+            # Some were created concurrently; update those on the next round
+            continue
+        break
+
+
+def _increment_basket_counts(basket_counts, n_baskets):
+    """Add ``{food_item_id: count}`` to the item basket counts and ``n_baskets`` to the total."""
+    FoodItemStats.objects.bulk_update(
+        [
+            FoodItemStats(food_item_id=food_item_id, basket_count=F('basket_count') + count)
+            for food_item_id, count in basket_counts.items()
+        ],
+        ['basket_count']
+    )
+    if not n_baskets or OrderStats.objects.filter(pk=1).update(basket_count=F('basket_count') + n_baskets):
+        return
+    try:
+        with transaction.atomic():
+            OrderStats.objects.create(pk=1, basket_count=n_baskets)
+    except IntegrityError:
+        # Created concurrently; fall back to the in-place update
+        OrderStats.objects.filter(pk=1).update(basket_count=F('basket_count') + n_baskets)
+
+
+def record_basket_items(food_item_ids, basket_item_ids):
+    """Count ``food_item_ids`` as newly added to a basket already holding ``basket_item_ids``.
+
+    Items already in the basket are ignored, so every distinct item counts
+    once per order whatever the number of lines.
+    """
+    basket = set(basket_item_ids)
+    new_basket = not basket
+    basket_counts = Counter()
+    pair_counts = Counter()
+    for food_item_id in food_item_ids:
+        if food_item_id in basket:
+            continue
+        basket_counts[food_item_id] += 1
+        for other_id in basket:
+            pair_counts[food_item_id, other_id] += 1
+            pair_counts[other_id, food_item_id] += 1
+        basket.add(food_item_id)
+
+    _increment_basket_counts(basket_counts, int(new_basket and bool(basket_counts)))
+    _increment_pairs(pair_counts)
+
+
+def record_baskets(baskets):
+    """Count whole new ``baskets`` (iterables of food item ids) in a fixed number of queries.
+
+    Equivalent to feeding each basket's items through ``record_basket_items``
+    but with the counts summed over every basket first.
+    """
+    basket_counts = Counter()
+    pair_counts = Counter()
+    n_baskets = 0
+    for basket in baskets:
+        items = set(basket)
+        n_baskets += bool(items)
+        basket_counts.update(items)
+        pair_counts.update(permutations(items, 2))
+
+    _increment_basket_counts(basket_counts, n_baskets)
+    _increment_pairs(pair_counts)
+
+
+def basket_total():
+    """Number of orders with at least one item."""
+    return OrderStats.objects.filter(pk=1).values_list('basket_count', flat=True).first() or 0
+
+
+def bought_together(food_item_id, n=10):
+    """Items most often in the same order as ``food_item_id``, best first.
+
+    Returns dicts with the pair ``count``, ``support`` (share of all orders
+    holding both), ``confidence`` (share of this item's orders that also hold
+    the other) and ``lift`` (confidence over the other item's base rate).
+    """
+    pairs = list(
+        ItemPairCount.objects
+        .filter(food_item_id=food_item_id)
+        .order_by('-count', 'other_id')
+        .values_list('other_id', 'count', 'other__stats__basket_count')[:n]
+    )
+    if not pairs:
+        return []
+
+    item_baskets = FoodItemStats.objects.filter(food_item_id=food_item_id).values_list('basket_count', flat=True).first()
+    total = basket_total()
+    results = []
+    for other_id, count, other_baskets in pairs:
+        confidence = count / item_baskets if item_baskets else 0.0
+        results.append({
+            'food_item_id': other_id,
+            'count': count,
+            'support': count / total if total else 0.0,
+            'confidence': confidence,
+            'lift': confidence * total / other_baskets if other_baskets else 0.0,
+        })
+    return results
+
+
+def basket_candidates(food_item_ids, n=10):
+    """``(food_item_id, co-occurrence count)`` pairs summed over the partners of ``food_item_ids``.
+
+    Only available partners outside ``food_item_ids`` are counted, so the
+    ``n`` returned are all candidates.
+    """
+    if not food_item_ids:
+        return []
+    return list(
+        ItemPairCount.objects
+        .filter(food_item_id__in=food_item_ids, other__is_available=True)
+        .exclude(other_id__in=food_item_ids)
+        .values('other_id')
+        .annotate(total=Sum('count'))
+        .order_by('-total', 'other_id')
+        .values_list('other_id', 'total')[:n]
+    )
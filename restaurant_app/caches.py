@@ -0,0 +1,83 @@
+import threading
+
+from django.core.cache import caches
+
+from .artifacts import get_artifact_bundle
+from .catalog import get_catalog_version
+
+
+def get_model_version():
+    """Version of everything recommendations depend on besides the user's own orders.
+
+    Offline model rebuilds run in their own process, so they are tracked by
+    the published bundle's version, which every worker reads from the
+    artifact directory, not by a counter in the cache.
+    """
+    bundle = get_artifact_bundle()
+    return f"{get_catalog_version()}.{bundle.version if bundle else 0}"
+
+
+class RecommendationCache:
+    """Recommended food item ids per user, stored in the ``recommendations`` cache.
+
+    Entries are keyed by user id and model version, so rebuilding a model or
+    editing the catalog orphans old entries instead of serving them; LRU
+    eviction and TTL come from the cache backend's ``MAX_ENTRIES``/``TIMEOUT``.
+    Each entry maps a strategy selection (``''`` for the default one) to ids,
+    so one delete invalidates every selection for a user. Hit/miss counters
+    are kept per process.
+    """
+
+    alias = 'recommendations'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def key(self, user_id, version=None):
+        return f"recommendations:{user_id}:{version or get_model_version()}"
+
+    def get(self, user_id, variant=''):
+        entry = self.backend.get(self.key(user_id))
+        food_item_ids = entry.get(variant) if entry else None
+        with self._lock:
+            if food_item_ids is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return food_item_ids
+
+    def set(self, user_id, food_item_ids, variant=''):
+        key = self.key(user_id)
+        entry = self.backend.get(key) or {}
+        entry[variant] = list(food_item_ids)
+        self.backend.set(key, entry)
+
+    def invalidate(self, user_id):
+        self.backend.delete(self.key(user_id))
+
+    def invalidate_many(self, user_ids):
+        version = get_model_version()
+        self.backend.delete_many([self.key(user_id, version) for user_id in user_ids])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+recommendation_cache = RecommendationCache()
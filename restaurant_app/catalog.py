@@ -0,0 +1,154 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .ranking import ItemIndex
+
+CATALOG_VERSION_KEY = 'restaurant_app:catalog_version'
+CATALOG_MODIFIED_KEY = 'restaurant_app:catalog_modified'
+
+
+def get_catalog_version():
+    """Current catalog version, shared across processes through the cache backend."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def get_catalog_modified():
+    """When the catalog version last moved; unknown (never bumped, or evicted) counts as now."""
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        cache.add(CATALOG_MODIFIED_KEY, timezone.now(), timeout=None)
+        modified = cache.get(CATALOG_MODIFIED_KEY, timezone.now())
+    return modified
+
+
+def bump_catalog_version():
+    """Mark every catalog-derived cache as stale."""
+    # Stamped first, so a reader seeing the new version sees this time too
+    cache.set(CATALOG_MODIFIED_KEY, timezone.now(), timeout=None)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Key missing (first write or evicted); start a fresh sequence
+        get_catalog_version()
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def catalog_fingerprint(FoodItem):
+    """``[item count, last update]`` of the catalog, stable across processes and restarts."""
+    state = FoodItem.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return [state['count'], state['updated'] and state['updated'].isoformat()]
+
+
+class CatalogIndex(ItemIndex):
+    """Every food item id, sorted, with a dense ``available`` mask over them.
+
+    ``version`` is the catalog version it was read at; any ``FoodItem`` save
+    or delete bumps that version, so availability stays in sync.
+    ``fingerprint`` is the ``catalog_fingerprint`` read alongside.
+    """
+
+    def __init__(self, item_ids, available, version=None, fingerprint=None):
+        super().__init__(item_ids)
+        self.available = np.asarray(available, dtype=bool)
+        self.version = version
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_food_items(cls, FoodItem, version=None):
+        fingerprint = catalog_fingerprint(FoodItem)
+        rows = np.array(
+            list(FoodItem.objects.order_by('id').values_list('id', 'is_available')),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        return cls(rows[:, 0], rows[:, 1].astype(bool), version=version, fingerprint=fingerprint)
+
+
+_catalog_index = None
+_catalog_index_lock = threading.Lock()
+
+
+def get_catalog_index(FoodItem):
+    """Return the catalog index, re-reading ids and availability only when the catalog version moved."""
+    global _catalog_index
+
+    version = get_catalog_version()
+    if _catalog_index is None or _catalog_index.version != version:
+        with _catalog_index_lock:
+            if _catalog_index is None or _catalog_index.version != version:
+                _catalog_index = CatalogIndex.from_food_items(FoodItem, version=version)
+    return _catalog_index
+
+
+def reset_catalog_index():
+    global _catalog_index
+
+    with _catalog_index_lock:
+        _catalog_index = None
+
+
+class CatalogSnapshot:
+    """Serialized food item rows as of one catalog version.
+
+    Holds everything list and retrieve responses need, including the
+    ``etag`` (a digest of the rows) and ``last_modified`` validators, so a
+    conditional GET is answered without a query while the version holds.
+    ``last_modified`` is the latest version bump or row update, as a
+    deletion leaves no ``updated_at`` behind.
+    """
+
+    def __init__(self, rows, version=None, last_modified=None):
+        self.rows = rows
+        self.by_id = {row['id']: row for row in rows}
+        self.version = version
+        self.last_modified = last_modified
+        digest = hashlib.md5(json.dumps(rows, sort_keys=True, cls=DjangoJSONEncoder).encode())
+        self.etag = f'"{digest.hexdigest()}"'
+
+    @classmethod
+    def from_food_items(cls, FoodItem, serialize, version=None, modified=None):
+        food_items = list(FoodItem.objects.order_by('id'))
+        changes = [food_item.updated_at for food_item in food_items]
+        if modified is not None:
+            changes.append(modified)
+        return cls(list(serialize(food_items)), version=version, last_modified=max(changes, default=None))
+
+
+_catalog_snapshots = {}
+_catalog_snapshots_lock = threading.Lock()
+
+
+def get_catalog_snapshot(FoodItem, serialize, base_url=''):
+    """Return the serialized catalog, re-reading it only when the catalog version moved.
+
+    ``serialize`` turns a list of food items into rows. Rows embed absolute
+    image URLs, so one snapshot is kept per ``base_url``.
+    """
+    version = get_catalog_version()
+    snapshot = _catalog_snapshots.get(base_url)
+    if snapshot is None or snapshot.version != version:
+        with _catalog_snapshots_lock:
+            snapshot = _catalog_snapshots.get(base_url)
+            if snapshot is None or snapshot.version != version:
+                snapshot = CatalogSnapshot.from_food_items(
+                    FoodItem, serialize, version=version, modified=get_catalog_modified()
+                )
+                for key in [key for key, other in _catalog_snapshots.items() if other.version != version]:
+                    del _catalog_snapshots[key]
+                _catalog_snapshots[base_url] = snapshot
+    return snapshot
+
+
+def reset_catalog_snapshots():
+    with _catalog_snapshots_lock:
+        _catalog_snapshots.clear()
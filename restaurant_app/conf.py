@@ -0,0 +1,54 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Where offline jobs write recommender artifacts
+    'ARTIFACT_DIR': settings.BASE_DIR / 'artifacts',
+    # Item-item neighbour table
+    'ITEM_NEIGHBORS_K': 20,
+    'ITEM_NEIGHBORS_CONTENT_WEIGHT': 0.5,
+    # Upper bound on the dense similarity tiles built by blockwise top-k
+    # searches (item neighbour build, offline precompute)
+    'SIMILARITY_MEMORY_BUDGET_MB': 64,
+    # Orders the live interaction matrix is built from: only the last N days
+    # and/or each customer's last M orders (None keeps everything), read in
+    # customer ranges of about INTERACTION_CHUNK_SIZE orders. Orders leaving
+    # the N-day window are aged out every INTERACTION_AGE_OUT_MINUTES.
+    'INTERACTION_WINDOW_DAYS': None,
+    'INTERACTION_MAX_ORDERS_PER_USER': None,
+    'INTERACTION_CHUNK_SIZE': 50000,
+    'INTERACTION_AGE_OUT_MINUTES': 60,
+    # Orders per transaction when ingesting POS uploads
+    'ORDER_INGEST_CHUNK_SIZE': 500,
+    # Popularity counters
+    'POPULARITY_HALF_LIFE_DAYS': 7,
+    'POPULARITY_CACHE_TTL': 60,
+    # Length of the in-memory "trending now" sliding window
+    'TRENDING_WINDOW_MINUTES': 60,
+    # User neighbour search for user_cf: 'exact', 'lsh', or 'auto' (LSH from
+    # ANN_MIN_USERS customers up)
+    'USER_NEIGHBOR_SEARCH': 'auto',
+    'ANN_MIN_USERS': 20000,
+    'ANN_TABLES': 16,
+    'ANN_BITS': 8,
+    # Embedding size of the latent factor ('latent') strategy
+    'LATENT_FACTORS': 32,
+    # Strategies run by default; requests can pick others with ?strategies=
+    'STRATEGIES': ['user_cf', 'item_cf', 'basket', 'content', 'popularity'],
+    # Threads shared by all requests for running strategies concurrently
+    'STRATEGY_WORKERS': 4,
+    # Relative weight of each strategy's (max-scaled) scores in the hybrid rank
+    'STRATEGY_WEIGHTS': {
+        'user_cf': 1.0,
+        'latent': 1.0,
+        'item_cf': 1.0,
+        'basket': 0.5,
+        'content': 0.5,
+        'popularity': 0.25,
+        'trending': 0.25,
+    },
+}
+
+
+def recommender_setting(name):
+    """Look up ``name`` in ``settings.RECOMMENDER``, falling back to ``DEFAULTS``."""
+    return getattr(settings, 'RECOMMENDER', {}).get(name, DEFAULTS[name])
@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .artifacts import get_artifact_bundle
+from .catalog import catalog_fingerprint, get_catalog_version
+
+
+def content_vectorizer():
+    """Unfitted TF-IDF vectorizer; its analyzer is the catalog's tokenizer."""
+    return TfidfVectorizer(stop_words='english')
+
+
+class ContentModel:
+    """TF-IDF vectors over the food catalog's name, description and category.
+
+    ``food_data`` holds one row per food item, in the same order as the rows
+    of ``matrix``; ``version`` is the catalog version it was fitted on.
+    """
+
+    def __init__(self, food_data, vectorizer, matrix, version=None):
+        self.food_data = food_data
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.version = version
+
+    @classmethod
+    def from_food_items(cls, FoodItem, version=None):
+        food_data = pd.DataFrame(
+            list(FoodItem.objects.order_by('id').values('id', 'name', 'description', 'category')),
+            columns=['id', 'name', 'description', 'category']
+        )
+        food_data['content'] = food_data['name'] + ' ' + food_data['description'] + ' ' + food_data['category']
+        food_data['category'] = food_data['category'].astype('category')
+
+        vectorizer = content_vectorizer()
+        try:
+            matrix = vectorizer.fit_transform(food_data['content'])
+        except ValueError:
+            # Empty catalog, or nothing left after stop word removal
+            matrix = sparse.csr_matrix((len(food_data), 0))
+
+        return cls(food_data, vectorizer, matrix, version=version)
+
+    @property
+    def item_ids(self):
+        return self.food_data['id'].to_numpy()
+
+    def rows_in_categories(self, categories):
+        """Row positions of the items belonging to any of ``categories``."""
+        return np.flatnonzero(self.food_data['category'].isin(categories).to_numpy())
+
+    def to_arrays(self):
+        matrix = sparse.csr_matrix(self.matrix, dtype=np.float32)
+        matrix.sort_indices()
+        vocabulary = getattr(self.vectorizer, 'vocabulary_', {})
+        terms = sorted(vocabulary, key=vocabulary.get)
+        return {
+            'content.item_ids': self.item_ids.astype(np.int64),
+            'content.categories': np.array(self.food_data['category'].tolist(), dtype=str),
+            'content.terms': np.array(terms, dtype=str),
+            'content.idf': getattr(self.vectorizer, 'idf_', np.empty(0)).astype(np.float32),
+            'content.data': matrix.data,
+            'content.indices': matrix.indices,
+            'content.indptr': matrix.indptr,
+        }
+
+    @classmethod
+    def from_bundle(cls, bundle, version=None):
+        """Rebuild a fitted model around the bundle's memory-mapped TF-IDF matrix."""
+        food_data = pd.DataFrame({
+            'id': bundle.array('content.item_ids'),
+            'category': pd.Categorical(bundle.array('content.categories')),
+        })
+        terms = bundle.array('content.terms')
+
+        vectorizer = content_vectorizer()
+        if len(terms):
+            vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms.tolist())}
+            vectorizer.idf_ = np.asarray(bundle.array('content.idf'), dtype=np.float64)
+
+        matrix = sparse.csr_matrix(
+            (bundle.array('content.data'), bundle.array('content.indices'), bundle.array('content.indptr')),
+            shape=(len(food_data), len(terms)),
+            copy=False
+        )
+        return cls(food_data, vectorizer, matrix, version=version)
+
+
+_content_model = None
+_content_model_lock = threading.Lock()
+
+
+def get_content_model(FoodItem):
+    """Return the fitted content model, refitting only when the catalog version moved.
+
+    A published bundle fitted on the same catalog is used instead of
+    refitting.
+    """
+    global _content_model
+
+    version = get_catalog_version()
+    if _content_model is None or _content_model.version != version:
+        with _content_model_lock:
+            if _content_model is None or _content_model.version != version:
+                _content_model = _load_content_model(FoodItem, version)
+    return _content_model
+
+
+def _load_content_model(FoodItem, version):
+    bundle = get_artifact_bundle()
+    if (
+        bundle is not None
+        and 'content.item_ids' in bundle
+        and bundle.metadata('content').get('fingerprint') == catalog_fingerprint(FoodItem)
+    ):
+        return ContentModel.from_bundle(bundle, version=version)
+    return ContentModel.from_food_items(FoodItem, version=version)
+
+
+def reset_content_model():
+    global _content_model
+
+    with _content_model_lock:
+        _content_model = None
@@ -0,0 +1,137 @@
+import threading
+
+import numpy as np
+from scipy.sparse.linalg import svds
+
+from .artifacts import get_artifact_bundle
+from .conf import recommender_setting
+from .interactions import InteractionMatrix
+from .ranking import top_k_indices
+
+
+class LatentFactorModel:
+    """User and item embeddings from a truncated SVD of the interaction matrix.
+
+    Quantities are treated as implicit feedback and damped with ``log1p`` so
+    a few bulk orders don't dominate. A user's score for an item is the dot
+    product of their embeddings, so scoring one user costs
+    O(items x factors) whatever the number of users or orders.
+    """
+
+    def __init__(self, user_ids, item_ids, user_factors, item_factors):
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.user_factors = np.asarray(user_factors, dtype=np.float32)
+        self.item_factors = np.asarray(item_factors, dtype=np.float32)
+
+        # Rows are kept in user id order so ``scores`` can binary-search
+        # ``user_ids`` instead of holding a dict over every user
+        if np.any(self.user_ids[1:] < self.user_ids[:-1]):
+            order = np.argsort(self.user_ids, kind='stable')
+            self.user_ids = self.user_ids[order]
+            self.user_factors = self.user_factors[order]
+
+    @property
+    def n_factors(self):
+        return self.item_factors.shape[1]
+
+    @classmethod
+    def train(cls, interactions, n_factors=None):
+        n_factors = n_factors or recommender_setting('LATENT_FACTORS')
+        matrix = interactions.matrix.astype(np.float32)
+        matrix.data = np.log1p(matrix.data)
+
+        # svds needs k < min(shape); tiny catalogs fall back to a dense SVD
+        n_factors = min(n_factors, min(matrix.shape))
+        if n_factors < min(matrix.shape):
+            u, s, vt = svds(matrix, k=n_factors, random_state=0)
+        elif n_factors:
+            u, s, vt = np.linalg.svd(matrix.toarray(), full_matrices=False)
+        else:
+            u, s, vt = np.zeros((matrix.shape[0], 0)), np.zeros(0), np.zeros((0, matrix.shape[1]))
+
+        scale = np.sqrt(s)
+        return cls(interactions.user_ids, interactions.item_ids, u * scale, vt.T * scale)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty(0), np.empty((0, 0)), np.empty((0, 0)))
+
+    @classmethod
+    def from_order_items(cls, OrderItem, n_factors=None):
+        return cls.train(InteractionMatrix.from_order_items(OrderItem), n_factors)
+
+    def scores(self, user_id):
+        """Scores for every item in ``item_ids``, or ``None`` for an unknown user."""
+        row = np.searchsorted(self.user_ids, user_id)
+        if row == len(self.user_ids) or self.user_ids[row] != user_id:
+            return None
+        return self.item_factors @ self.user_factors[row]
+
+    def recommend(self, user_id, n=10, mask=None):
+        """``(food_item_ids, scores)`` of the user's ``n`` best items, best first.
+
+        ``mask`` optionally marks, per entry of ``item_ids``, the items that
+        may be returned.
+        """
+        scores = self.scores(user_id)
+        if scores is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        top = top_k_indices(scores, n)
+        return self.item_ids[top], scores[top]
+
+    def to_arrays(self):
+        return {
+            'latent.user_ids': self.user_ids,
+            'latent.item_ids': self.item_ids,
+            'latent.user_factors': self.user_factors,
+            'latent.item_factors': self.item_factors,
+        }
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(
+            bundle.array('latent.user_ids'),
+            bundle.array('latent.item_ids'),
+            bundle.array('latent.user_factors'),
+            bundle.array('latent.item_factors')
+        )
+
+
+_latent_factors = None
+_latent_factors_lock = threading.Lock()
+
+
+def get_latent_factors(OrderItem):
+    """Return the latent factor model from the published bundle.
+
+    The model is reloaded whenever a new bundle is published. Training is
+    left to ``train_latent_factors``; until a bundle holds a model, no user
+    has latent scores.
+    """
+    global _latent_factors
+
+    bundle = get_artifact_bundle()
+    if bundle is not None and 'latent.user_ids' not in bundle:
+        bundle = None
+    version = bundle and bundle.version
+
+    if _latent_factors is None or _latent_factors[0] != version:
+        with _latent_factors_lock:
+            if _latent_factors is None or _latent_factors[0] != version:
+                if bundle is not None:
+                    model = LatentFactorModel.from_bundle(bundle)
+                else:
+                    model = LatentFactorModel.empty()
+                _latent_factors = (version, model)
+    return _latent_factors[1]
+
+
+def reset_latent_factors():
+    global _latent_factors
+
+    with _latent_factors_lock:
+        _latent_factors = None
@@ -0,0 +1,81 @@
+from itertools import islice
+
+from django.db import transaction
+
+from .caches import recommendation_cache
+from .conf import recommender_setting
+from .models import FoodItem, Order, OrderItem, PrecomputedRecommendation, User
+from .serializers import BulkOrderSerializer, build_order_items, order_line_errors
+from .signals import record_order_items
+
+
+def ingest_orders(rows, chunk_size=None):
+    """Write POS order ``rows`` in chunked transactions, returning one result per row.
+
+    ``rows`` may be any iterable (such as a streamed NDJSON body); it is
+    consumed ``chunk_size`` rows at a time. Each chunk resolves its customers
+    and food items with one query each, inserts its valid orders and their
+    lines with ``bulk_create`` and updates counters, profiles and caches
+    once. Invalid rows are reported as ``{'row': i, 'errors': ...}`` and
+    skipped; created ones as ``{'row': i, 'id': order_id}``.
+    """
+    chunk_size = chunk_size or recommender_setting('ORDER_INGEST_CHUNK_SIZE')
+    rows = iter(rows)
+    results = []
+    while chunk := list(islice(rows, chunk_size)):
+        results.extend(_ingest_chunk(chunk, offset=len(results)))
+    return results
+
+
+def _ingest_chunk(rows, offset):
+    results = [None] * len(rows)
+    valid = []
+    for index, row in enumerate(rows):
+        if isinstance(row, Exception):
+            results[index] = {'row': offset + index, 'errors': {'non_field_errors': [str(row)]}}
+            continue
+        serializer = BulkOrderSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {'row': offset + index, 'errors': serializer.errors}
+
+    with transaction.atomic():
+        customers = User.objects.in_bulk({data['customer'] for _, data in valid})
+        food_items = FoodItem.objects.select_for_update().in_bulk(
+            {item_data['food_item_id'] for _, data in valid for item_data in data['items']}
+        )
+
+        orders = []
+        for index, data in valid:
+            errors = {}
+            if data['customer'] not in customers:
+                errors['customer'] = [f"Invalid pk \"{data['customer']}\" - object does not exist."]
+            line_errors = order_line_errors(data['items'], food_items)
+            if line_errors:
+                errors['items'] = line_errors
+            if errors:
+                results[index] = {'row': offset + index, 'errors': errors}
+                continue
+
+            total_price, order_items = build_order_items(data['items'], food_items)
+            order = Order(customer=customers[data['customer']], total_price=total_price)
+            if 'status' in data:
+                order.status = data['status']
+            orders.append((index, order, order_items))
+
+        Order.objects.bulk_create([order for _, order, _ in orders])
+        lines = []
+        for index, order, order_items in orders:
+            for order_item in order_items:
+                order_item.order = order
+            lines.extend(order_items)
+            results[index] = {'row': offset + index, 'id': order.pk}
+        OrderItem.objects.bulk_create(lines)
+
+        record_order_items(lines)
+        customer_ids = {order.customer_id for _, order, _ in orders}
+        PrecomputedRecommendation.objects.filter(user_id__in=customer_ids).delete()
+        transaction.on_commit(lambda: recommendation_cache.invalidate_many(customer_ids))
+
+    return results
@@ -0,0 +1,432 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+from django.db.models import F, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .ann import RandomProjectionIndex
+from .conf import recommender_setting
+from .ranking import top_k_indices
+
+
+def _grow(array, size):
+    """Return ``array`` with room for at least ``size`` entries (amortized doubling)."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def windowed_order_items(OrderItem, window_days=None, max_orders=None, customer_ids=None, customer_range=None):
+    """Order items inside the configured interaction window.
+
+    ``window_days`` keeps orders placed in the last N days and ``max_orders``
+    each customer's most recent M orders; both default to the
+    ``INTERACTION_*`` settings and ``None`` means no limit.
+
+    ``customer_ids`` (a collection of ids) or ``customer_range`` (an
+    ``(after, upto)`` pair of ids, ``upto`` ``None`` for no upper bound)
+    restrict the result to some customers. The restriction is applied
+    before ranking each customer's orders, so only those customers' orders
+    are read.
+    """
+    if window_days is None:
+        window_days = recommender_setting('INTERACTION_WINDOW_DAYS')
+    if max_orders is None:
+        max_orders = recommender_setting('INTERACTION_MAX_ORDERS_PER_USER')
+
+    customers = {}
+    if customer_ids is not None:
+        customers['customer_id__in'] = customer_ids
+    if customer_range is not None:
+        after, upto = customer_range
+        customers['customer_id__gt'] = after
+        if upto is not None:
+            customers['customer_id__lte'] = upto
+
+    order_items = OrderItem.objects.filter(**{f'order__{lookup}': value for lookup, value in customers.items()})
+    if window_days:
+        order_items = order_items.filter(order__created_at__gte=timezone.now() - timedelta(days=window_days))
+    if max_orders:
+        Order = OrderItem._meta.get_field('order').related_model
+        recent_orders = Order.objects.filter(**customers).annotate(
+            recency=Window(
+                RowNumber(),
+                partition_by=F('customer_id'),
+                order_by=[F('created_at').desc(), F('id').desc()]
+            )
+        ).filter(recency__lte=max_orders)
+        order_items = order_items.filter(order__in=recent_orders.values('id'))
+    return order_items
+
+
+def normalize_rows(matrix):
+    """Scale each row of a sparse matrix to unit L2 norm, leaving empty rows as zeros."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+    return (sparse.diags(scale) @ matrix).tocsr()
+
+
+class InteractionMatrix:
+    """User x food item quantity matrix kept in CSR form.
+
+    Rows are customers and columns are food items; ``user_ids``/``item_ids``
+    map row and column positions back to primary keys and ``user_index``/
+    ``item_index`` map primary keys to positions.
+
+    Rows patched through ``update_user`` are kept in a small overlay on top of
+    the CSR base so an update only touches that user's entries. The overlay is
+    folded into the base once it grows past ``compact_threshold`` rows or when
+    the full ``matrix`` is requested.
+    """
+
+    compact_threshold = 1024
+
+    def __init__(self, user_ids, item_ids, matrix):
+        self._user_ids = np.asarray(user_ids, dtype=np.int64)
+        self._item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.n_users = len(self._user_ids)
+        self.n_items = len(self._item_ids)
+        self.user_index = {int(user_id): row for row, user_id in enumerate(self._user_ids)}
+        self.item_index = {int(item_id): col for col, item_id in enumerate(self._item_ids)}
+
+        self._base = sparse.csr_matrix(matrix, dtype=np.float32)
+        self._overlay = {}
+        self._row_norms = np.sqrt(
+            np.asarray(self._base.multiply(self._base).sum(axis=1)).ravel()
+        ).astype(np.float32)
+        self._lock = threading.RLock()
+
+        self._ann_index = None
+        self._ann_stale_rows = set()
+        self.window_start = None
+
+    @classmethod
+    def from_order_items(cls, OrderItem, window_days=None, max_orders=None, chunk_size=None):
+        """Build from the order items in the interaction window.
+
+        Customers are read in id order, a range holding about ``chunk_size``
+        orders at a time, so each customer's order window is only ranked
+        among their own orders. Rows are kept as int32/float32 arrays, so
+        peak memory is one chunk of Python tuples plus 12 bytes per
+        interaction. ``window_start`` records the window's cutoff, if any.
+        """
+        chunk_size = chunk_size or recommender_setting('INTERACTION_CHUNK_SIZE')
+        if window_days is None:
+            window_days = recommender_setting('INTERACTION_WINDOW_DAYS')
+        window_start = timezone.now() - timedelta(days=window_days) if window_days else None
+        Order = OrderItem._meta.get_field('order').related_model
+        customers = Order.objects.order_by('customer_id').values_list('customer_id', flat=True)
+
+        user_ids, item_ids, quantities = [], [], []
+        last_customer_id = 0
+        while last_customer_id is not None:
+            # The customer of the chunk_size-th order past the last chunk
+            # closes this one; without one, this is the last chunk
+            upto = customers.filter(customer_id__gt=last_customer_id)[chunk_size - 1:chunk_size].first()
+            chunk = list(
+                windowed_order_items(
+                    OrderItem, window_days, max_orders, customer_range=(last_customer_id, upto)
+                ).values_list('order__customer_id', 'food_item_id', 'quantity')
+            )
+            last_customer_id = upto
+            if not chunk:
+                continue
+            rows = np.array(chunk, dtype=np.int64)
+            user_ids.append(rows[:, 0].astype(np.int32))
+            item_ids.append(rows[:, 1].astype(np.int32))
+            quantities.append(rows[:, 2].astype(np.float32))
+
+        if not user_ids:
+            interactions = cls.from_columns(np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float32))
+        else:
+            interactions = cls.from_columns(np.concatenate(user_ids), np.concatenate(item_ids), np.concatenate(quantities))
+        interactions.window_start = window_start
+        return interactions
+
+    @classmethod
+    def from_columns(cls, user_ids, item_ids, quantities):
+        """Build from parallel arrays of customer ids, food item ids and quantities."""
+        user_ids, user_positions = np.unique(user_ids, return_inverse=True)
+        item_ids, item_positions = np.unique(item_ids, return_inverse=True)
+
+        # Duplicate (user, item) pairs are summed when converting to CSR.
+        matrix = sparse.coo_matrix(
+            (np.asarray(quantities, dtype=np.float32), (user_positions, item_positions)),
+            shape=(len(user_ids), len(item_ids))
+        ).tocsr()
+
+        return cls(user_ids, item_ids, matrix)
+
+    @property
+    def user_ids(self):
+        return self._user_ids[:self.n_users]
+
+    @property
+    def item_ids(self):
+        return self._item_ids[:self.n_items]
+
+    @property
+    def row_norms(self):
+        return self._row_norms[:self.n_users]
+
+    @property
+    def shape(self):
+        return (self.n_users, self.n_items)
+
+    @property
+    def matrix(self):
+        """The full CSR matrix, with any pending row patches applied."""
+        with self._lock:
+            self._compact()
+            return self._base
+
+    def user_row(self, row):
+        """``(columns, quantities)`` of one user's non-zero entries."""
+        with self._lock:
+            if row in self._overlay:
+                return self._overlay[row]
+            if row >= self._base.shape[0]:
+                return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+            start, end = self._base.indptr[row], self._base.indptr[row + 1]
+            return self._base.indices[start:end], self._base.data[start:end]
+
+    def _query_vector(self, row):
+        columns, values = self.user_row(row)
+        query = np.zeros(self.n_items, dtype=np.float32)
+        query[columns] = values
+        return query
+
+    def _cosines(self, row, scores, other_norms):
+        denominator = other_norms * self.row_norms[row]
+        return np.divide(
+            scores, denominator,
+            out=np.zeros_like(scores),
+            where=denominator > 0
+        )
+
+    def user_similarities(self, row):
+        """Cosine similarity between one user row and every other row."""
+        with self._lock:
+            query = self._query_vector(row)
+
+            scores = np.zeros(self.n_users, dtype=np.float32)
+            base_rows, base_cols = self._base.shape
+            scores[:base_rows] = self._base @ query[:base_cols]
+            for patched_row, (patched_columns, patched_values) in self._overlay.items():
+                scores[patched_row] = patched_values @ query[patched_columns]
+
+            return self._cosines(row, scores, self.row_norms)
+
+    def candidate_similarities(self, row, candidates):
+        """Cosine similarity between one user row and the given candidate rows."""
+        with self._lock:
+            query = self._query_vector(row)
+
+            scores = np.zeros(len(candidates), dtype=np.float32)
+            base_rows, base_cols = self._base.shape
+            in_base = candidates < base_rows
+            scores[in_base] = self._base[candidates[in_base]] @ query[:base_cols]
+            for position, candidate in enumerate(candidates.tolist()):
+                if candidate in self._overlay:
+                    patched_columns, patched_values = self._overlay[candidate]
+                    scores[position] = patched_values @ query[patched_columns]
+
+            return self._cosines(row, scores, self.row_norms[candidates])
+
+    def nearest_users(self, row, k=5, approximate=False):
+        """``(rows, similarities)`` of the ``k`` most similar users, excluding ``row``.
+
+        With ``approximate`` the search only scores users that share an LSH
+        bucket with ``row`` (plus rows changed since the index was built),
+        falling back to the exact scan when that yields fewer than ``k``.
+        """
+        if approximate:
+            candidates = self.ann_candidates(row)
+            candidates = candidates[candidates != row]
+            if len(candidates) >= k:
+                similarities = self.candidate_similarities(row, candidates)
+                order = np.argsort(-similarities, kind='stable')[:k]
+                return candidates[order], similarities[order]
+
+        similarities = self.user_similarities(row)
+        similarities[row] = -np.inf
+        order = top_k_indices(similarities, k)
+        return order, similarities[order]
+
+    def ann_candidates(self, row):
+        """Candidate neighbour rows for ``row`` from the LSH index, building it if needed."""
+        with self._lock:
+            if self._ann_index is None or len(self._ann_stale_rows) > self.compact_threshold:
+                self._ann_index = RandomProjectionIndex(
+                    self.n_items,
+                    n_tables=recommender_setting('ANN_TABLES'),
+                    n_bits=recommender_setting('ANN_BITS')
+                ).fit(self.matrix)
+                self._ann_stale_rows = set()
+
+            columns, values = self.user_row(row)
+            query = sparse.csr_matrix(
+                (values, columns, [0, len(columns)]),
+                shape=(1, self.n_items)
+            )
+            candidates = self._ann_index.candidates(query)
+            if self._ann_stale_rows:
+                candidates = np.union1d(candidates, np.fromiter(self._ann_stale_rows, dtype=np.int64))
+            return candidates
+
+    def update_user(self, user_id, item_ids, quantities):
+        """Replace one user's row with the given per-item quantity totals.
+
+        Unknown users and items are appended as new rows/columns; the cost is
+        proportional to the number of entries in the user's row.
+        """
+        item_ids = np.asarray(item_ids, dtype=np.int64)
+        quantities = np.asarray(quantities, dtype=np.float32)
+
+        with self._lock:
+            row = self.user_index.get(int(user_id))
+            if row is None:
+                if not len(item_ids):
+                    return
+                row = self._append_user(user_id)
+
+            columns = np.array(
+                [self._column_for(item_id) for item_id in item_ids],
+                dtype=np.int32
+            )
+            order = np.argsort(columns)
+            self._overlay[row] = (columns[order], quantities[order])
+            self._ann_stale_rows.add(row)
+            self._row_norms[row] = np.sqrt(np.dot(quantities, quantities))
+
+            if len(self._overlay) > self.compact_threshold:
+                self._compact()
+
+    def _append_user(self, user_id):
+        row = self.n_users
+        self._user_ids = _grow(self._user_ids, row + 1)
+        self._row_norms = _grow(self._row_norms, row + 1)
+        self._user_ids[row] = user_id
+        self._row_norms[row] = 0
+        self.user_index[int(user_id)] = row
+        self.n_users += 1
+        return row
+
+    def _column_for(self, item_id):
+        column = self.item_index.get(int(item_id))
+        if column is None:
+            column = self.n_items
+            self._item_ids = _grow(self._item_ids, column + 1)
+            self._item_ids[column] = item_id
+            self.item_index[int(item_id)] = column
+            self.n_items += 1
+        return column
+
+    def _compact(self):
+        base = self._base
+        if base.shape != self.shape:
+            base = base.copy()
+            base.resize(self.shape)
+        if not self._overlay:
+            self._base = base
+            return
+
+        patched_rows = np.fromiter(self._overlay.keys(), dtype=np.int64)
+        keep = np.ones(self.n_users, dtype=np.float32)
+        keep[patched_rows] = 0
+
+        rows = np.concatenate([
+            np.full(len(columns), row, dtype=np.int64)
+            for row, (columns, _) in self._overlay.items()
+        ])
+        columns = np.concatenate([columns for columns, _ in self._overlay.values()])
+        values = np.concatenate([values for _, values in self._overlay.values()])
+        patch = sparse.csr_matrix((values, (rows, columns)), shape=self.shape, dtype=np.float32)
+
+        compacted = (sparse.diags(keep) @ base + patch).tocsr()
+        compacted.eliminate_zeros()
+        self._base = compacted
+        self._overlay = {}
+
+
+_interaction_matrix = None
+_interaction_matrix_lock = threading.Lock()
+
+
+def get_interaction_matrix(OrderItem):
+    """Return the process-wide interaction matrix, building it on first use.
+
+    With ``INTERACTION_WINDOW_DAYS`` set, the rows of customers whose orders
+    have since left the window are re-read once the window has moved by
+    ``INTERACTION_AGE_OUT_MINUTES``.
+    """
+    global _interaction_matrix
+
+    if _interaction_matrix is None:
+        with _interaction_matrix_lock:
+            if _interaction_matrix is None:
+                _interaction_matrix = InteractionMatrix.from_order_items(OrderItem)
+
+    interactions = _interaction_matrix
+    window_days = recommender_setting('INTERACTION_WINDOW_DAYS')
+    if window_days and interactions.window_start is not None:
+        window_start = timezone.now() - timedelta(days=window_days)
+        if window_start - interactions.window_start >= timedelta(minutes=recommender_setting('INTERACTION_AGE_OUT_MINUTES')):
+            with _interaction_matrix_lock:
+                if window_start - interactions.window_start >= timedelta(minutes=recommender_setting('INTERACTION_AGE_OUT_MINUTES')):
+                    _age_out(interactions, OrderItem, window_start)
+    return interactions
+
+
+def _age_out(interactions, OrderItem, window_start):
+    """Drop the orders placed before ``window_start`` from the matrix."""
+    Order = OrderItem._meta.get_field('order').related_model
+    customer_ids = set(
+        Order.objects
+        .filter(created_at__gte=interactions.window_start, created_at__lt=window_start)
+        .values_list('customer_id', flat=True)
+        .distinct()
+    )
+    interactions.window_start = window_start
+    _refresh_rows(interactions, OrderItem, customer_ids)
+
+
+def refresh_users(OrderItem, user_ids):
+    """Re-read the given customers' rows into the cached matrix, if one exists."""
+    interactions = _interaction_matrix
+    if interactions is None:
+        # Nothing cached yet; the next read builds from current data.
+        return
+    _refresh_rows(interactions, OrderItem, user_ids)
+
+
+def _refresh_rows(interactions, OrderItem, user_ids):
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    totals = {user_id: ([], []) for user_id in user_ids}
+    rows = (
+        windowed_order_items(OrderItem, customer_ids=user_ids)
+        .values_list('order__customer_id', 'food_item_id')
+        .annotate(total_quantity=Sum('quantity'))
+    )
+    for user_id, item_id, quantity in rows:
+        totals[user_id][0].append(item_id)
+        totals[user_id][1].append(quantity)
+
+    for user_id, (item_ids, quantities) in totals.items():
+        interactions.update_user(user_id, item_ids, quantities)
+
+
+def reset_interaction_matrix():
+    """Drop the cached matrix so the next read rebuilds it from the database."""
+    global _interaction_matrix
+
+    with _interaction_matrix_lock:
+        _interaction_matrix = None
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.artifacts import publish_bundle
+from restaurant_app.models import FoodItem, OrderItem
+from restaurant_app.neighbors import ItemNeighborTable
+from restaurant_app.store import load_interactions
+
+
+class Command(BaseCommand):
+    help = 'Precompute the top-K similar food items for every item in the catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, help='Neighbours to keep per item')
+        parser.add_argument(
+            '--content-weight', type=float,
+            help='Weight of TF-IDF similarity versus co-purchase similarity (0-1)'
+        )
+        parser.add_argument(
+            '--memory-budget', type=int,
+            help='MB for similarity tiles (default: SIMILARITY_MEMORY_BUDGET_MB)'
+        )
+
+    def handle(self, *args, **options):
+        table = ItemNeighborTable.build(
+            FoodItem, OrderItem,
+            k=options['k'],
+            content_weight=options['content_weight'],
+            memory_budget=options['memory_budget'] and options['memory_budget'] * 1024 * 1024,
+            interactions=load_interactions(OrderItem)
+        )
+
+        bundle = publish_bundle(table.to_arrays())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {table.k} neighbours for {len(table.item_ids)} food items in bundle {bundle.version}'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.artifacts import publish_bundle
+from restaurant_app.catalog import catalog_fingerprint
+from restaurant_app.content import ContentModel
+from restaurant_app.factors import LatentFactorModel
+from restaurant_app.models import FoodItem, OrderItem
+from restaurant_app.neighbors import ItemNeighborTable
+from restaurant_app.store import load_interactions
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every recommender model and publish them as one memory-mapped bundle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, help='Latent factor embedding size')
+        parser.add_argument('--k', type=int, help='Neighbours to keep per item')
+        parser.add_argument('--keep', type=int, default=3, help='Published bundles to keep on disk')
+
+    def handle(self, *args, **options):
+        # Fingerprint first: a catalog edit during the build then just makes
+        # workers refit the content model instead of serving a stale one
+        fingerprint = catalog_fingerprint(FoodItem)
+        content_model = ContentModel.from_food_items(FoodItem)
+        interactions = load_interactions(OrderItem)
+        neighbors = ItemNeighborTable.build(FoodItem, OrderItem, k=options['k'], interactions=interactions)
+        factors = LatentFactorModel.train(interactions, options['factors'])
+
+        bundle = publish_bundle(
+            {**content_model.to_arrays(), **neighbors.to_arrays(), **factors.to_arrays()},
+            metadata={'content': {'fingerprint': fingerprint}},
+            keep=options['keep'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published bundle {bundle.version} with {len(bundle.manifest["arrays"])} arrays'
+        ))
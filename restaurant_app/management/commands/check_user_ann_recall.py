@@ -0,0 +1,25 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from restaurant_app.ann import neighbor_recall
+from restaurant_app.models import OrderItem
+from restaurant_app.store import load_interactions
+
+
+class Command(BaseCommand):
+    help = 'Compare approximate (LSH) user neighbour search against the exact scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=200, help='Users to sample')
+        parser.add_argument('--k', type=int, default=5, help='Neighbours per user')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        interactions = load_interactions(OrderItem)
+        rng = np.random.default_rng(options['seed'])
+        rows = rng.choice(interactions.n_users, size=min(options['sample'], interactions.n_users), replace=False)
+
+        recall = neighbor_recall(interactions, rows, k=options['k'])
+        self.stdout.write(
+            f"Recall@{options['k']} over {len(rows)} users: {recall:.3f}"
+        )
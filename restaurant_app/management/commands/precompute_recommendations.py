@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from restaurant_app.catalog import CatalogIndex, catalog_fingerprint
+from restaurant_app.models import FoodItem, OrderItem, PrecomputedRecommendation, User
+from restaurant_app.precompute import iter_recommendation_blocks
+from restaurant_app.store import load_interactions
+
+
+class Command(BaseCommand):
+    help = 'Precompute collaborative-filtering recommendations for active customers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', help='Only precompute for these user ids')
+        parser.add_argument('--block-size', type=int, default=1024, help='Users scored per sparse product')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--neighbors', type=int, default=5, help='Similar users considered per user')
+        parser.add_argument('--top-n', type=int, default=10, help='Recommendations stored per user')
+        parser.add_argument(
+            '--memory-budget', type=int,
+            help='MB per worker for similarity tiles (default: SIMILARITY_MEMORY_BUDGET_MB)'
+        )
+
+    def handle(self, *args, **options):
+        # Fingerprinted first, so a catalog edit during the run leaves the
+        # rows stale. The fingerprint comes from the database, as this
+        # process shares no cache with the server.
+        catalog = CatalogIndex.from_food_items(FoodItem)
+        interactions = load_interactions(OrderItem)
+
+        users = User.objects.filter(is_active=True)
+        if options['users']:
+            users = users.filter(id__in=options['users'])
+        rows = sorted(
+            interactions.user_index[user_id]
+            for user_id in users.values_list('id', flat=True).iterator()
+            if user_id in interactions.user_index
+        )
+
+        stored = 0
+        blocks = iter_recommendation_blocks(
+            interactions.matrix, rows,
+            block_size=options['block_size'],
+            workers=options['workers'],
+            n_neighbors=options['neighbors'],
+            n_recommendations=options['top_n'],
+            memory_budget=options['memory_budget'] and options['memory_budget'] * 1024 * 1024,
+            available=catalog.lookup(catalog.available, interactions.item_ids),
+        )
+        for block_rows, columns, scores in blocks:
+            stored += self._store_block(interactions, block_rows, columns, scores, catalog.fingerprint)
+
+        self.stdout.write(self.style.SUCCESS(f'Stored recommendations for {stored} users'))
+
+    def _store_block(self, interactions, rows, columns, scores, fingerprint):
+        recommendations = []
+        for row, row_columns, row_scores in zip(rows, columns, scores):
+            valid = row_columns >= 0
+            recommendations.append(PrecomputedRecommendation(
+                user_id=int(interactions.user_ids[row]),
+                food_item_ids=interactions.item_ids[row_columns[valid]].tolist(),
+                scores=np.round(row_scores[valid], 6).tolist(),
+                catalog_fingerprint=fingerprint,
+            ))
+
+        with transaction.atomic():
+            PrecomputedRecommendation.objects.bulk_create(
+                recommendations,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['food_item_ids', 'scores', 'catalog_fingerprint', 'computed_at'],
+            )
+        return len(recommendations)
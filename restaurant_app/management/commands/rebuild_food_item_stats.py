@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.models import FoodItem, FoodItemStats, OrderItem
+from restaurant_app.popularity import rebuild_food_item_stats, reset_top_lists
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized popularity counters from the full order history'
+
+    def handle(self, *args, **options):
+        rebuild_food_item_stats(FoodItem, OrderItem, FoodItemStats)
+        reset_top_lists()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt popularity counters for {FoodItemStats.objects.count()} food items'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.baskets import rebuild_item_pairs
+from restaurant_app.models import FoodItemStats, ItemPairCount, OrderItem, OrderStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute "frequently ordered together" pair counts from every order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows read and written per batch')
+
+    def handle(self, *args, **options):
+        n_items, n_pairs = rebuild_item_pairs(
+            OrderItem, ItemPairCount, FoodItemStats, OrderStats, chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Stored {n_pairs} item pairs over {n_items} food items'))
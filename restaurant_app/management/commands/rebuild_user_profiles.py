@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.models import OrderItem, UserProfile
+from restaurant_app.profiles import rebuild_user_profiles
+
+
+class Command(BaseCommand):
+    help = 'Recompute customer taste profiles from the full order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', help='Only rebuild these user ids')
+
+    def handle(self, *args, **options):
+        rebuild_user_profiles(OrderItem, UserProfile, user_ids=options['users'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt taste profiles for {UserProfile.objects.count()} customers'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.models import OrderItem
+from restaurant_app.store import InteractionStore
+
+
+class Command(BaseCommand):
+    help = 'Append new order items to the columnar interaction store used for training'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recreate the store from the full order history')
+        parser.add_argument('--chunk-size', type=int, default=100000, help='Rows fetched and written per chunk')
+
+    def handle(self, *args, **options):
+        store = InteractionStore()
+        if options['rebuild']:
+            added = store.rebuild(OrderItem, chunk_size=options['chunk_size'])
+        else:
+            added = store.append_new(OrderItem, chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Added {added} interactions; {len(store)} stored up to order item {store.meta["watermark"]}'
+        ))
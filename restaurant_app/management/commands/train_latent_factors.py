@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from restaurant_app.artifacts import publish_bundle
+from restaurant_app.factors import LatentFactorModel
+from restaurant_app.models import OrderItem
+from restaurant_app.store import load_interactions
+
+
+class Command(BaseCommand):
+    help = 'Train user and item embeddings for the latent factor strategy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, help='Embedding size (default: LATENT_FACTORS)')
+
+    def handle(self, *args, **options):
+        model = LatentFactorModel.train(load_interactions(OrderItem), n_factors=options['factors'])
+
+        bundle = publish_bundle(model.to_arrays())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {model.n_factors} factors for {len(model.user_ids)} users '
+            f'and {len(model.item_ids)} food items in bundle {bundle.version}'
+        ))
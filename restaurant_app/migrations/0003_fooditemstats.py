@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_food_item_stats(apps, schema_editor):
+    # Counters are filled in from the order history by 0008; the logic is
+    # frozen here rather than imported, as app code moves on
+    FoodItem = apps.get_model('restaurant_app', 'FoodItem')
+    FoodItemStats = apps.get_model('restaurant_app', 'FoodItemStats')
+    FoodItemStats.objects.bulk_create(
+        (FoodItemStats(food_item_id=food_item_id) for food_item_id in FoodItem.objects.values_list('id', flat=True).iterator()),
+        batch_size=10000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0002_precomputedrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodItemStats',
+            fields=[
+                ('food_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='restaurant_app.fooditem')),
+                ('total_quantity', models.PositiveBigIntegerField(default=0)),
+                ('decayed_quantity', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total_quantity'], name='foodstats_total_idx'), models.Index(fields=['-decayed_quantity'], name='foodstats_decayed_idx')],
+            },
+        ),
+        migrations.RunPython(create_food_item_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:29
+
+from collections import Counter
+from itertools import groupby, permutations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_item_pairs(apps, schema_editor):
+    # Frozen copy of the pair and basket counting as of this migration; app
+    # code must not be imported here
+    OrderItem = apps.get_model('restaurant_app', 'OrderItem')
+    ItemPairCount = apps.get_model('restaurant_app', 'ItemPairCount')
+    FoodItemStats = apps.get_model('restaurant_app', 'FoodItemStats')
+
+    basket_counts = Counter()
+    pair_counts = Counter()
+    rows = OrderItem.objects.order_by('order_id').values_list('order_id', 'food_item_id')
+    for _, lines in groupby(rows.iterator(chunk_size=10000), key=lambda row: row[0]):
+        items = {food_item_id for _, food_item_id in lines}
+        basket_counts.update(items)
+        pair_counts.update(permutations(items, 2))
+
+    ItemPairCount.objects.bulk_create(
+        (
+            ItemPairCount(food_item_id=food_item_id, other_id=other_id, count=count)
+            for (food_item_id, other_id), count in pair_counts.items()
+        ),
+        batch_size=10000
+    )
+    FoodItemStats.objects.bulk_update(
+        [FoodItemStats(food_item_id=food_item_id, basket_count=count) for food_item_id, count in basket_counts.items()],
+        ['basket_count'],
+        batch_size=10000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0004_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditemstats',
+            name='basket_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ItemPairCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('food_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pair_counts', to='restaurant_app.fooditem')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurant_app.fooditem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['food_item', '-count'], name='itempair_item_count_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='itempaircount',
+            constraint=models.UniqueConstraint(fields=('food_item', 'other'), name='itempair_unique'),
+        ),
+        migrations.RunPython(populate_item_pairs, migrations.RunPython.noop),
+    ]
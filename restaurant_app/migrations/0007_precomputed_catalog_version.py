@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0006_order_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='precomputedrecommendation',
+            name='catalog_version',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
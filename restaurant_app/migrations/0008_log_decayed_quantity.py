@@ -0,0 +1,109 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:03
+
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of restaurant_app.popularity's forward decay as of this
+# migration; app code must not be imported here
+DECAY_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def log_decayed(quantity, timestamp, half_life):
+    if quantity <= 0:
+        return None
+    days = (timestamp - DECAY_EPOCH).total_seconds() / 86400
+    return math.log(quantity) + days / half_life * math.log(2)
+
+
+def log_add(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def rebuild_from_orders(apps, schema_editor):
+    """Recompute the log-space counters and profiles from the order history.
+
+    Values written by earlier migrations or code are not converted in
+    place: depending on the version that wrote them they are linear or
+    already logs.
+    """
+    FoodItemStats = apps.get_model('restaurant_app', 'FoodItemStats')
+    OrderItem = apps.get_model('restaurant_app', 'OrderItem')
+    UserProfile = apps.get_model('restaurant_app', 'UserProfile')
+    half_life = getattr(settings, 'RECOMMENDER', {}).get('POPULARITY_HALF_LIFE_DAYS', 7)
+
+    totals = defaultdict(int)
+    decayed = {}
+    counts = defaultdict(lambda: defaultdict(int))
+    affinity = defaultdict(dict)
+    last_order_at = {}
+    rows = OrderItem.objects.values_list(
+        'food_item_id', 'order__customer_id', 'food_item__category', 'quantity', 'order__created_at'
+    )
+    for food_item_id, user_id, category, quantity, created_at in rows.iterator(chunk_size=10000):
+        weight = log_decayed(quantity, created_at, half_life)
+        totals[food_item_id] += quantity
+        decayed[food_item_id] = log_add(decayed.get(food_item_id), weight)
+        counts[user_id][category] += quantity
+        category_affinity = log_add(affinity[user_id].get(category), weight)
+        if category_affinity is not None:
+            affinity[user_id][category] = category_affinity
+        if user_id not in last_order_at or created_at > last_order_at[user_id]:
+            last_order_at[user_id] = created_at
+
+    # Basket counts on the existing rows are kept
+    stats = []
+    for row in FoodItemStats.objects.iterator():
+        row.total_quantity = totals.get(row.food_item_id, 0)
+        row.log_decayed_quantity = decayed.get(row.food_item_id)
+        stats.append(row)
+    FoodItemStats.objects.bulk_update(stats, ['total_quantity', 'log_decayed_quantity'], batch_size=1000)
+
+    UserProfile.objects.all().delete()
+    UserProfile.objects.bulk_create(
+        (
+            UserProfile(
+                user_id=user_id,
+                category_counts=dict(counts[user_id]),
+                category_affinity=affinity[user_id],
+                last_order_at=last_order_at[user_id]
+            )
+            for user_id in counts
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0007_precomputed_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditemstats',
+            name='log_decayed_quantity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(rebuild_from_orders, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='fooditemstats',
+            name='foodstats_decayed_idx',
+        ),
+        migrations.RemoveField(
+            model_name='fooditemstats',
+            name='decayed_quantity',
+        ),
+        migrations.AddIndex(
+            model_name='fooditemstats',
+            index=models.Index(fields=['-log_decayed_quantity'], name='foodstats_decayed_idx'),
+        ),
+    ]
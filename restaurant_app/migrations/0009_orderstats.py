@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+def count_baskets(apps, schema_editor):
+    OrderItem = apps.get_model('restaurant_app', 'OrderItem')
+    OrderStats = apps.get_model('restaurant_app', 'OrderStats')
+    OrderStats.objects.create(pk=1, basket_count=OrderItem.objects.values('order_id').distinct().count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0008_log_decayed_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('basket_count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_baskets, migrations.RunPython.noop),
+    ]
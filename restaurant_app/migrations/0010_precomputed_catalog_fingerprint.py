@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0009_orderstats'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='precomputedrecommendation',
+            name='catalog_version',
+        ),
+        migrations.AddField(
+            model_name='precomputedrecommendation',
+            name='catalog_fingerprint',
+            field=models.JSONField(null=True),
+        ),
+    ]
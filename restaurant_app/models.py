@@ -75,6 +75,13 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Order listings page through (created_at, id), per customer or overall
+            models.Index(fields=['customer', 'created_at'], name='order_customer_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+        ]
+
     def __str__(self):
         return self.status
 
@@ -84,3 +91,84 @@ class OrderItem(models.Model):
     food_item = models.ForeignKey(FoodItem, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'food_item'], name='orderitem_order_item_idx'),
+        ]
+
+
+class PrecomputedRecommendation(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    food_item_ids = models.JSONField(default=list)
+    scores = models.JSONField(default=list)
+    # catalog_fingerprint() the row was computed at; rows from any other
+    # catalog state are stale. Read from the database, so it means the same
+    # in the offline job's process as in every server worker.
+    catalog_fingerprint = models.JSONField(null=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+
+class FoodItemStats(models.Model):
+    food_item = models.OneToOneField(FoodItem, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_quantity = models.PositiveBigIntegerField(default=0)
+    # Natural log of the forward-decayed quantity: each sale is weighted by its
+    # age relative to a fixed landmark, so ranking by this column ranks by
+    # recency-weighted sales. Logs grow linearly with time where the weights
+    # themselves would overflow; NULL means no sales.
+    log_decayed_quantity = models.FloatField(null=True, blank=True)
+    # Number of orders containing the item, for basket support and lift
+    basket_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-total_quantity'], name='foodstats_total_idx'),
+            models.Index(fields=['-log_decayed_quantity'], name='foodstats_decayed_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.food_item_id}: {self.total_quantity}'
+
+
+class OrderStats(models.Model):
+    # Single row (pk 1) of order-wide counters, kept alongside FoodItemStats.
+    # Number of orders containing at least one item, the denominator of
+    # basket support and lift
+    basket_count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.basket_count} baskets'
+
+
+class ItemPairCount(models.Model):
+    # Number of orders containing both items. Every pair is stored in both
+    # directions so one item's partners are a single index range scan.
+    food_item = models.ForeignKey(FoodItem, on_delete=models.CASCADE, related_name='pair_counts')
+    other = models.ForeignKey(FoodItem, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['food_item', 'other'], name='itempair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['food_item', '-count'], name='itempair_item_count_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.food_item_id} + {self.other_id}: {self.count}'
+
+
+class UserProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='taste_profile')
+    # {category: quantity ordered}
+    category_counts = models.JSONField(default=dict)
+    # {category: log of the forward-decayed quantity}, the same recency
+    # weighting as FoodItemStats.log_decayed_quantity
+    category_affinity = models.JSONField(default=dict)
+    last_order_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Taste profile of {self.user_id}'
@@ -0,0 +1,138 @@
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from .artifacts import get_artifact_bundle
+from .conf import recommender_setting
+from .content import get_content_model
+from .interactions import get_interaction_matrix, normalize_rows
+from .similarity import blockwise_top_k
+
+
+class ItemNeighborTable:
+    """Precomputed top-K most similar food items for every catalog item.
+
+    ``item_ids`` is sorted so a lookup is a binary search followed by reading
+    one row of ``neighbor_ids``/``scores``. Rows are ordered best first and
+    padded with ``-1``/``0`` when an item has fewer than K similar items.
+    """
+
+    def __init__(self, item_ids, neighbor_ids, scores):
+        self.item_ids = np.asarray(item_ids, dtype=np.int32)
+        self.neighbor_ids = np.asarray(neighbor_ids, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+
+    @property
+    def k(self):
+        return self.neighbor_ids.shape[1]
+
+    def neighbors(self, item_id):
+        """``(neighbor_ids, scores)`` for one item, best first."""
+        row = np.searchsorted(self.item_ids, item_id)
+        if row == len(self.item_ids) or self.item_ids[row] != item_id:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        neighbor_ids = self.neighbor_ids[row]
+        valid = neighbor_ids >= 0
+        return neighbor_ids[valid], self.scores[row][valid]
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty((0, 0)), np.empty((0, 0)))
+
+    @classmethod
+    def build(cls, FoodItem, OrderItem, k=None, content_weight=None, memory_budget=None, interactions=None):
+        """Blend co-purchase cosine with TF-IDF cosine and keep the top ``k``.
+
+        ``interactions`` defaults to the live interaction matrix.
+        """
+        k = k or recommender_setting('ITEM_NEIGHBORS_K')
+        if content_weight is None:
+            content_weight = recommender_setting('ITEM_NEIGHBORS_CONTENT_WEIGHT')
+
+        content_model = get_content_model(FoodItem)
+        item_ids = content_model.item_ids
+        n_items = len(item_ids)
+        text_vectors = normalize_rows(content_model.matrix)
+        interactions = interactions or get_interaction_matrix(OrderItem)
+        purchase_vectors = normalize_rows(_purchase_vectors(item_ids, interactions))
+
+        # Dot products of the stacked, weighted unit vectors are exactly the
+        # blended similarity, so one blockwise search covers both signals
+        features = sparse.hstack([
+            np.sqrt(content_weight) * text_vectors,
+            np.sqrt(1 - content_weight) * purchase_vectors,
+        ]).tocsr()
+
+        k = min(k, max(n_items - 1, 0))
+        top, top_scores = blockwise_top_k(
+            features, features, k, exclude=np.arange(n_items), memory_budget=memory_budget, normalized=True
+        )
+        similar = top_scores > 0
+        neighbor_ids = np.where(similar, item_ids[np.maximum(top, 0)], -1)
+        scores = np.where(similar, top_scores, 0)
+
+        return cls(item_ids, neighbor_ids, scores)
+
+    def to_arrays(self):
+        return {
+            'neighbors.item_ids': self.item_ids,
+            'neighbors.neighbor_ids': self.neighbor_ids,
+            'neighbors.scores': self.scores,
+        }
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(
+            bundle.array('neighbors.item_ids'),
+            bundle.array('neighbors.neighbor_ids'),
+            bundle.array('neighbors.scores')
+        )
+
+
+def _purchase_vectors(item_ids, interactions):
+    """Item x customer quantities from ``interactions``, one row per ``item_ids`` entry."""
+    columns = np.array([interactions.item_index.get(int(item_id), -1) for item_id in item_ids], dtype=np.int64)
+    known = np.flatnonzero(columns >= 0)
+    selector = sparse.csr_matrix(
+        (np.ones(len(known), dtype=np.float32), (known, columns[known])),
+        shape=(len(item_ids), interactions.n_items)
+    )
+    return (selector @ interactions.matrix.T).tocsr()
+
+
+_item_neighbors = None
+_item_neighbors_lock = threading.Lock()
+
+
+def get_item_neighbors(FoodItem, OrderItem):
+    """Return the item neighbour table from the published bundle.
+
+    The table is reloaded whenever a new bundle is published. Building it is
+    an all-pairs search, left to ``build_item_neighbors``; until a bundle
+    holds one, every item has no neighbours.
+    """
+    global _item_neighbors
+
+    bundle = get_artifact_bundle()
+    if bundle is not None and 'neighbors.item_ids' not in bundle:
+        bundle = None
+    version = bundle and bundle.version
+
+    if _item_neighbors is None or _item_neighbors[0] != version:
+        with _item_neighbors_lock:
+            if _item_neighbors is None or _item_neighbors[0] != version:
+                if bundle is not None:
+                    table = ItemNeighborTable.from_bundle(bundle)
+                else:
+                    table = ItemNeighborTable.empty()
+                _item_neighbors = (version, table)
+    return _item_neighbors[1]
+
+
+def reset_item_neighbors():
+    global _item_neighbors
+
+    with _item_neighbors_lock:
+        _item_neighbors = None
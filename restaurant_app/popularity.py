@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .conf import recommender_setting
+from .models import FoodItemStats
+
+# Landmark for forward decay. A sale's weight, 2 ** (days since the landmark
+# / half-life), would overflow a float within a few years, so weights and
+# decayed sums are only ever handled as natural logs, which grow linearly.
+DECAY_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def log_decayed(quantity, timestamp):
+    """Log of ``quantity`` forward-decayed from ``timestamp``; ``None`` (log 0) for no quantity."""
+    if quantity <= 0:
+        return None
+    half_life = recommender_setting('POPULARITY_HALF_LIFE_DAYS')
+    days = (timestamp - DECAY_EPOCH).total_seconds() / 86400
+    return math.log(quantity) + days / half_life * math.log(2)
+
+
+def log_add(a, b):
+    """``log(exp(a) + exp(b))`` without overflow, with ``None`` standing for log 0."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def log_add_expression(field, value):
+    """SQL counterpart of ``log_add(field, value)`` for a nullable float column."""
+    value = Value(value, output_field=FloatField())
+    return Case(
+        When(**{f'{field}__isnull': True}, then=value),
+        default=Greatest(F(field), value) + Ln(1 + Exp(-Abs(F(field) - value))),
+        output_field=FloatField()
+    )
+
+
+def record_sales(quantities, timestamp=None):
+    """Add ``{food_item_id: quantity}`` to the popularity counters in place.
+
+    Missing counter rows are inserted first, ignoring any that exist, so
+    every item's counters are then bumped by a single ``UPDATE ... CASE``.
+    """
+    timestamp = timestamp or timezone.now()
+    if not quantities:
+        return
+
+    FoodItemStats.objects.bulk_create(
+        [FoodItemStats(food_item_id=food_item_id) for food_item_id in quantities],
+        ignore_conflicts=True
+    )
+    changes = []
+    for food_item_id, quantity in quantities.items():
+        decayed = log_decayed(quantity, timestamp)
+        changes.append(FoodItemStats(
+            food_item_id=food_item_id,
+            total_quantity=F('total_quantity') + quantity,
+            log_decayed_quantity=(
+                F('log_decayed_quantity') if decayed is None
+                else log_add_expression('log_decayed_quantity', decayed)
+            )
+        ))
+    FoodItemStats.objects.bulk_update(changes, ['total_quantity', 'log_decayed_quantity'])
+
+
+def rebuild_food_item_stats(FoodItem, OrderItem, FoodItemStats, chunk_size=10000):
+    """Recompute every item's counters from the full order history."""
+    totals = defaultdict(int)
+    decayed = {}
+    rows = OrderItem.objects.values_list('food_item_id', 'quantity', 'order__created_at')
+    for food_item_id, quantity, created_at in rows.iterator(chunk_size=chunk_size):
+        totals[food_item_id] += quantity
+        decayed[food_item_id] = log_add(decayed.get(food_item_id), log_decayed(quantity, created_at))
+
+    with transaction.atomic():
+        FoodItemStats.objects.all().delete()
+        FoodItemStats.objects.bulk_create(
+            (
+                FoodItemStats(
+                    food_item_id=food_item_id,
+                    total_quantity=totals[food_item_id],
+                    log_decayed_quantity=decayed.get(food_item_id)
+                )
+                for food_item_id in FoodItem.objects.values_list('id', flat=True).iterator(chunk_size=chunk_size)
+            ),
+            batch_size=chunk_size
+        )
+
+
+_top_lists = {}
+_top_lists_lock = threading.Lock()
+
+
+def top_food_items(n=10, category=None, decayed=False, sold_only=False, available_only=False):
+    """``(food_item_id, quantity)`` pairs for the best-selling food items.
+
+    Reads the top ``n`` rows of the stats table by the indexed counter,
+    optionally within one category or among available items only, and
+    keeps the result in memory for ``POPULARITY_CACHE_TTL`` seconds. Decayed lists only hold items that
+    sold, with quantities relative to the best seller's, which is 1.
+    """
+    key = (n, category, decayed, sold_only, available_only)
+    now = time.monotonic()
+    cached = _top_lists.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    order_field = 'log_decayed_quantity' if decayed else 'total_quantity'
+    stats = FoodItemStats.objects.all()
+    if category is not None:
+        stats = stats.filter(food_item__category=category)
+    if sold_only:
+        stats = stats.filter(total_quantity__gt=0)
+    if available_only:
+        stats = stats.filter(food_item__is_available=True)
+    if decayed:
+        stats = stats.filter(log_decayed_quantity__isnull=False)
+
+    top_items = list(
+        stats.order_by(f'-{order_field}', 'food_item_id').values_list('food_item_id', order_field)[:n]
+    )
+    if decayed and top_items:
+        best = top_items[0][1]
+        top_items = [(food_item_id, math.exp(quantity - best)) for food_item_id, quantity in top_items]
+    with _top_lists_lock:
+        _top_lists[key] = (now + recommender_setting('POPULARITY_CACHE_TTL'), top_items)
+    return top_items
+
+
+def top_food_item_ids(n=10, category=None, decayed=False, sold_only=False, available_only=False):
+    """Ids of the best-selling food items; see ``top_food_items``."""
+    return [
+        food_item_id
+        for food_item_id, _ in top_food_items(
+            n, category=category, decayed=decayed, sold_only=sold_only, available_only=available_only
+        )
+    ]
+
+
+def reset_top_lists():
+    with _top_lists_lock:
+        _top_lists.clear()
@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from .conf import recommender_setting
+from .interactions import normalize_rows
+from .similarity import blockwise_top_k
+
+
+class BlockRecommender:
+    """User-user collaborative filtering for a whole block of users at once.
+
+    Neighbours are found with a blockwise top-k search whose similarity tiles
+    stay within ``SIMILARITY_MEMORY_BUDGET_MB``, and one sparse product
+    against the interaction matrix scores the block's items. Items
+    nobody similar ordered are ranked by overall popularity, so every user
+    gets a full list.
+    """
+
+    def __init__(self, matrix, n_neighbors=5, n_recommendations=10, memory_budget=None):
+        self.matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        self.normalized = normalize_rows(self.matrix)
+        self.n_neighbors = n_neighbors
+        self.n_recommendations = n_recommendations
+        self.memory_budget = memory_budget
+
+        # Small enough never to outrank a real neighbour score
+        popularity = np.asarray(self.matrix.sum(axis=0)).ravel()
+        self.popularity_prior = (popularity / (popularity.max() or 1) * 1e-3).astype(np.float32)
+
+    def recommend(self, rows, available=None):
+        """Top item columns and scores for each row in ``rows``, best first.
+
+        ``available`` optionally marks the columns that may be recommended.
+        Rows with fewer candidates than ``n_recommendations`` are padded with
+        column ``-1`` and score ``-inf``.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        # A user is not their own neighbour
+        neighbor_rows, similarities = blockwise_top_k(
+            self.normalized[rows], self.normalized, self.n_neighbors, exclude=rows,
+            memory_budget=self.memory_budget, normalized=True
+        )
+        similar = similarities > 0
+        neighbors = sparse.csr_matrix(
+            (similarities[similar], (np.nonzero(similar)[0], neighbor_rows[similar])),
+            shape=(len(rows), self.matrix.shape[0])
+        )
+        scores = (neighbors @ self.matrix).toarray() + self.popularity_prior
+        scores[self.matrix[rows].nonzero()] = -np.inf
+        if available is not None:
+            scores[:, ~np.asarray(available, dtype=bool)] = -np.inf
+
+        return top_n_columns(scores, self.n_recommendations)
+
+
+def top_n_columns(scores, n):
+    """Column positions and values of the ``n`` best entries of each row, best first."""
+    n_columns = scores.shape[1]
+    if n < n_columns:
+        top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    else:
+        top = np.tile(np.arange(n_columns), (scores.shape[0], 1))
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return np.where(np.isfinite(top_scores), top, -1), top_scores
+
+
+_block_recommender = None
+_available_columns = None
+
+
+def _init_worker(matrix, n_neighbors, n_recommendations, memory_budget, available):
+    global _block_recommender, _available_columns
+    _block_recommender = BlockRecommender(matrix, n_neighbors, n_recommendations, memory_budget)
+    _available_columns = available
+
+
+def _recommend_block(rows):
+    columns, scores = _block_recommender.recommend(rows, _available_columns)
+    return rows, columns, scores
+
+
+def iter_recommendation_blocks(matrix, rows, block_size=1024, workers=1, n_neighbors=5, n_recommendations=10,
+                               memory_budget=None, available=None):
+    """Yield ``(rows, columns, scores)`` for consecutive blocks of ``rows``.
+
+    With more than one worker the blocks are spread over a process pool; the
+    matrix is shipped to each worker once, when the pool starts.
+    ``memory_budget`` (bytes) bounds each worker's similarity tiles and
+    defaults to ``SIMILARITY_MEMORY_BUDGET_MB``; ``available`` masks the
+    columns that may be recommended.
+    """
+    if memory_budget is None:
+        memory_budget = recommender_setting('SIMILARITY_MEMORY_BUDGET_MB') * 1024 * 1024
+    rows = np.asarray(rows, dtype=np.int64)
+    blocks = [rows[start:start + block_size] for start in range(0, len(rows), block_size)]
+    initargs = (matrix, n_neighbors, n_recommendations, memory_budget, available)
+
+    if workers <= 1:
+        _init_worker(*initargs)
+        for block in blocks:
+            yield _recommend_block(block)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        yield from executor.map(_recommend_block, blocks)
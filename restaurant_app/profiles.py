@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UserProfile
+from .popularity import log_add, log_decayed
+
+
+def record_purchases(user_id, quantities, timestamp):
+    """Add ``{category: quantity}`` bought at ``timestamp`` to the user's profile."""
+    record_customer_purchases({user_id: (quantities, timestamp)})
+
+
+def record_customer_purchases(purchases):
+    """Add ``{user_id: ({category: quantity}, timestamp)}`` to many profiles at once.
+
+    Missing profiles are inserted first, ignoring existing ones, then every
+    profile is locked with one ``SELECT ... FOR UPDATE`` and written back
+    with one bulk update, however many customers.
+    """
+    if not purchases:
+        return
+    with transaction.atomic():
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=user_id) for user_id in purchases],
+            ignore_conflicts=True
+        )
+        profiles = list(UserProfile.objects.select_for_update().filter(user_id__in=purchases))
+        now = timezone.now()
+        for profile in profiles:
+            quantities, timestamp = purchases[profile.user_id]
+            for category, quantity in quantities.items():
+                profile.category_counts[category] = profile.category_counts.get(category, 0) + quantity
+                decayed = log_add(profile.category_affinity.get(category), log_decayed(quantity, timestamp))
+                if decayed is not None:
+                    profile.category_affinity[category] = decayed
+            if profile.last_order_at is None or timestamp > profile.last_order_at:
+                profile.last_order_at = timestamp
+            profile.updated_at = now
+        UserProfile.objects.bulk_update(
+            profiles, ['category_counts', 'category_affinity', 'last_order_at', 'updated_at']
+        )
+
+
+def rebuild_user_profiles(OrderItem, UserProfile, user_ids=None, chunk_size=10000):
+    """Recompute profiles from the order history, for ``user_ids`` or everyone."""
+    counts = defaultdict(lambda: defaultdict(int))
+    affinity = defaultdict(dict)
+    last_order_at = {}
+
+    rows = OrderItem.objects.all()
+    profiles = UserProfile.objects.all()
+    if user_ids is not None:
+        rows = rows.filter(order__customer_id__in=user_ids)
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    rows = rows.values_list('order__customer_id', 'food_item__category', 'quantity', 'order__created_at')
+    for user_id, category, quantity, created_at in rows.iterator(chunk_size=chunk_size):
+        counts[user_id][category] += quantity
+        decayed = log_add(affinity[user_id].get(category), log_decayed(quantity, created_at))
+        if decayed is not None:
+            affinity[user_id][category] = decayed
+        if user_id not in last_order_at or created_at > last_order_at[user_id]:
+            last_order_at[user_id] = created_at
+
+    with transaction.atomic():
+        profiles.delete()
+        UserProfile.objects.bulk_create(
+            (
+                UserProfile(
+                    user_id=user_id,
+                    category_counts=dict(counts[user_id]),
+                    category_affinity=dict(affinity[user_id]),
+                    last_order_at=last_order_at[user_id]
+                )
+                for user_id in counts
+            ),
+            batch_size=chunk_size
+        )
+
+
+def category_affinity(user_id):
+    """The user's ``{category: log of the recency-weighted quantity}``, one primary-key lookup."""
+    affinity = UserProfile.objects.filter(user_id=user_id).values_list('category_affinity', flat=True).first()
+    return affinity or {}
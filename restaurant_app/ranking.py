@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """Indices of the ``k`` largest finite scores, best first, ties broken by index."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    top = top[np.lexsort((top, -scores[top]))]
+    return top[np.isfinite(scores[top])]
+
+
+class ItemIndex:
+    """Dense positions for a sorted array of food item ids."""
+
+    def __init__(self, item_ids):
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+
+    def positions(self, ids):
+        """Index positions of ``ids`` plus a mask of which ``ids`` are in the index."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(self.item_ids):
+            return np.empty(0, dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.item_ids, ids), len(self.item_ids) - 1)
+        found = self.item_ids[positions] == ids
+        return positions[found], found
+
+    def mask(self, ids):
+        """Boolean array over the index, true for every item in ``ids``."""
+        mask = np.zeros(len(self.item_ids), dtype=bool)
+        mask[self.positions(ids)[0]] = True
+        return mask
+
+    def lookup(self, mask, ids):
+        """Values of the index-wide boolean ``mask`` at ``ids``; false for unknown ids."""
+        positions, found = self.positions(ids)
+        values = np.zeros(len(found), dtype=bool)
+        values[found] = mask[positions]
+        return values
+
+
+class HybridRanker(ItemIndex):
+    """Fuses per-strategy candidate scores over a dense index of food items.
+
+    ``item_ids`` must be sorted. Each strategy's scores are scaled by its best
+    score, multiplied by the strategy's weight and summed; items no strategy
+    proposed, or that are excluded, can never be selected.
+    """
+
+    def __init__(self, item_ids, weights):
+        super().__init__(item_ids)
+        self.weights = weights
+
+    def rank(self, strategy_scores, exclude, n):
+        """Top ``n`` item ids from ``{strategy: (ids, scores)}``, skipping ``exclude``."""
+        fused = np.zeros(len(self.item_ids), dtype=np.float32)
+        candidates = np.zeros(len(self.item_ids), dtype=bool)
+
+        for name, (ids, scores) in strategy_scores.items():
+            weight = self.weights.get(name, 0)
+            if not weight:
+                continue
+            positions, found = self.positions(ids)
+            scores = np.asarray(scores, dtype=np.float32)[found]
+            candidates[positions] = True
+
+            peak = scores.max() if len(scores) else 0
+            if peak > 0:
+                np.add.at(fused, positions, weight * np.maximum(scores, 0) / peak)
+
+        fused[~candidates | exclude] = -np.inf
+        return self.item_ids[top_k_indices(fused, n)].tolist()
@@ -1,135 +1,343 @@
-import pandas as pd
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from django.db.models import Count, Sum
 
+from .conf import recommender_setting
+from .baskets import basket_candidates
+from .catalog import get_catalog_index
+from .content import get_content_model
+from .factors import get_latent_factors
+from .interactions import get_interaction_matrix, windowed_order_items
+from .neighbors import get_item_neighbors
+from .popularity import top_food_items
+from .profiles import category_affinity
+from .ranking import HybridRanker, top_k_indices
+from .trending import get_trending_counter
 
-class RestaurantRecommender:
-    def __init__(self, user, Order, OrderItem, FoodItem):
-        self.user = user
-        self.Order = Order
+
+class UserSnapshot:
+    """Data access for one recommendation request.
+
+    The items the user ordered (within the interaction window) and their
+    recency-weighted category affinity from ``UserProfile`` are loaded up
+    front and combined with the catalog's availability mask into
+    ``candidate_mask``. Shared models (interaction matrix,
+    TF-IDF model, neighbour table, latent factors, popularity lists) and the
+    user's basket partners are loaded on first access; ``prefetch`` loads the
+    ones a set of strategies needs before they are dispatched, so strategies
+    never go back to the database and can run on worker threads.
+    """
+
+    def __init__(self, user, OrderItem, FoodItem):
         self.OrderItem = OrderItem
         self.FoodItem = FoodItem
 
-    def _prepare_order_data(self):
-        
-        order_items = self.OrderItem.objects.select_related('order', 'food_item').all()
+        self.ordered_item_ids = set(
+            windowed_order_items(OrderItem, customer_ids=[user.id])
+            .values_list('food_item_id', flat=True)
+        )
+        self.category_affinity = Counter(category_affinity(user.id))
 
-        df = pd.DataFrame(list(order_items.values(
-            'order__customer_id',
-            'food_item_id',
-            'food_item__name',
-            'food_item__category',
-            'quantity'
-        )))
+        # Items a strategy may propose: available and not already ordered
+        self.catalog = get_catalog_index(FoodItem)
+        self.candidate_mask = self.catalog.available & ~self.catalog.mask(self.ordered_item_ids)
 
-        df.columns = [
-            'user_id',
-            'food_item_id',
-            'food_name',
-            'category',
-            'quantity'
-        ]
+    def allowed(self, ids):
+        """Boolean array marking which of ``ids`` are candidates for this user."""
+        return self.catalog.lookup(self.candidate_mask, ids)
 
-        return df
+    @cached_property
+    def interactions(self):
+        return get_interaction_matrix(self.OrderItem)
 
-    def collaborative_filtering(self):
-        df = self._prepare_order_data()
+    @cached_property
+    def content_model(self):
+        return get_content_model(self.FoodItem)
 
-        user_item_matrix = df.pivot_table(
-            index='user_id',
-            columns='food_item_id',
-            values='quantity',
-            fill_value=0
-        )
+    @cached_property
+    def item_neighbors(self):
+        return get_item_neighbors(self.FoodItem, self.OrderItem)
 
-        user_similarity = cosine_similarity(user_item_matrix)
-        user_similarity_df = pd.DataFrame(
-            user_similarity,
-            index=user_item_matrix.index,
-            columns=user_item_matrix.index
-        )
+    @cached_property
+    def latent_factors(self):
+        return get_latent_factors(self.OrderItem)
 
-        if self.user.id not in user_similarity_df.index:
-            return []
+    @cached_property
+    def basket_partners(self):
+        return basket_candidates(self.ordered_item_ids, n=20)
 
-        similar_users = user_similarity_df.loc[self.user.id].sort_values(ascending=False)[1:6]
+    # Shared top lists are fetched with one extra entry per ordered item, so
+    # at least ``n`` remain once the user's own items are masked out
+    def _headroom(self, n):
+        return n + len(self.ordered_item_ids)
 
-        # Get items liked by similar users
-        recommended_items = df[
-            df['user_id'].isin(similar_users.index) &
-            ~df['food_item_id'].isin(
-                self.OrderItem.objects.filter(order__customer=self.user)
-                .values_list('food_item_id', flat=True)
-            )
-        ]
+    @cached_property
+    def trending_now(self):
+        return get_trending_counter().top(self._headroom(10))
 
-        return recommended_items['food_item_id'].unique().tolist()
+    @cached_property
+    def popular_items(self):
+        return top_food_items(n=self._headroom(10), sold_only=True, available_only=True)
 
-    def content_based_filtering(self):
+    @cached_property
+    def trending_items(self):
+        return top_food_items(n=self._headroom(10), decayed=True, available_only=True)
 
-        food_items = self.FoodItem.objects.all()
+    def prefetch(self, sources):
+        for source in sources:
+            getattr(self, source)
 
-        user_categories = (
-            self.OrderItem.objects
-            .filter(order__customer=self.user)
-            .values('food_item__category')
-            .annotate(count=Count('food_item__category'))
-            .order_by('-count')
-        )
 
-        if not user_categories:
-            return list(self.FoodItem.objects.order_by('?')[:10].values_list('id', flat=True))
+class Strategy:
+    """A registered recommendation strategy.
+
+    ``score(user, snapshot)`` returns ``(food_item_ids, scores)`` with higher
+    scores being better; ``requires`` names the ``UserSnapshot`` attributes it
+    reads.
+    """
+
+    def __init__(self, name, score, requires=()):
+        self.name = name
+        self.score = score
+        self.requires = tuple(requires)
+
+
+STRATEGIES = {}
+
+
+def register_strategy(name, requires=()):
+    """Decorator adding a scoring function to the strategy registry."""
+    def decorator(score):
+        STRATEGIES[name] = Strategy(name, score, requires)
+        return score
+    return decorator
+
+
+def resolve_strategies(names=None):
+    """Validate strategy names, defaulting to ``RECOMMENDER['STRATEGIES']``."""
+    names = list(names or recommender_setting('STRATEGIES'))
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown recommendation strategies: {', '.join(unknown)}")
+    return names
+
+
+def _no_scores():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+def _pairs_to_scores(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return _no_scores()
+    ids, scores = zip(*pairs)
+    return np.asarray(ids, dtype=np.int64), np.asarray(scores, dtype=np.float32)
+
+
+def _allowed_scores(snapshot, scored):
+    ids, scores = scored
+    keep = snapshot.allowed(ids)
+    return ids[keep], scores[keep]
+
+
+def _top_scores(ids, scores, n):
+    top = top_k_indices(scores, n)
+    return ids[top], scores[top]
+
+
+def _ranked_ids(scored):
+    ids, scores = scored
+    return ids[np.argsort(-scores, kind='stable')].tolist()
+
+
+@register_strategy('user_cf', requires=('interactions',))
+def user_cf_scores(user, snapshot, n_neighbors=5):
+    """Items ordered by the most similar users, scored by similarity x quantity."""
+    interactions = snapshot.interactions
+
+    user_row = interactions.user_index.get(user.id)
+    if user_row is None:
+        return _no_scores()
+
+    search = recommender_setting('USER_NEIGHBOR_SEARCH')
+    approximate = search == 'lsh' or (
+        search == 'auto' and interactions.n_users >= recommender_setting('ANN_MIN_USERS')
+    )
+    similar_users, similarities = interactions.nearest_users(user_row, k=n_neighbors, approximate=approximate)
+
+    # Get items ordered by similar users that this user hasn't ordered yet
+    scores = {}
+    for similar_user, similarity in zip(similar_users, similarities):
+        columns, quantities = interactions.user_row(similar_user)
+        for column, quantity in zip(columns.tolist(), quantities.tolist()):
+            scores[column] = scores.get(column, 0) + similarity * quantity
+
+    columns = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+    return _allowed_scores(snapshot, (
+        interactions.item_ids[columns], np.fromiter(scores.values(), dtype=np.float32, count=len(scores))
+    ))
+
 
-        food_data = pd.DataFrame(list(food_items.values('id', 'name', 'description', 'category')))
-        food_data['content'] = food_data['name'] + ' ' + food_data['description'] + ' ' + food_data['category']
+@register_strategy('latent', requires=('latent_factors',))
+def latent_scores(user, snapshot, n_candidates=10):
+    """Best items by the dot product of the user's and the items' embeddings."""
+    model = snapshot.latent_factors
+    return model.recommend(user.id, n_candidates, mask=snapshot.allowed(model.item_ids))
 
-        vectorizer = TfidfVectorizer(stop_words='english')
-        content_matrix = vectorizer.fit_transform(food_data['content'])
 
-        # Find similar items based on content
-        preferred_categories = [cat['food_item__category'] for cat in user_categories[:2]]
+@register_strategy('item_cf', requires=('interactions', 'item_neighbors'))
+def item_cf_scores(user, snapshot, n_candidates=10):
+    """Items most similar to what the user already ordered, from the neighbour table."""
+    interactions = snapshot.interactions
 
-        similar_items = food_data[food_data['category'].isin(preferred_categories)]
-        similar_matrix = vectorizer.transform(similar_items['content'])
+    user_row = interactions.user_index.get(user.id)
+    if user_row is None:
+        return _no_scores()
 
-        content_similarities = cosine_similarity(content_matrix, similar_matrix)
+    neighbor_table = snapshot.item_neighbors
+    ordered_columns, quantities = interactions.user_row(user_row)
+    ordered_ids = interactions.item_ids[ordered_columns]
 
-        top_indices = content_similarities.mean(axis=1).argsort()[::-1][:10]
+    candidate_scores = {}
+    for item_id, quantity in zip(ordered_ids.tolist(), quantities.tolist()):
+        neighbor_ids, scores = neighbor_table.neighbors(item_id)
+        for neighbor_id, score in zip(neighbor_ids.tolist(), scores.tolist()):
+            candidate_scores[neighbor_id] = candidate_scores.get(neighbor_id, 0) + quantity * score
 
-        return food_data.iloc[top_indices]['id'].tolist()
+    ids, scores = _allowed_scores(snapshot, _pairs_to_scores(candidate_scores.items()))
+    return _top_scores(ids, scores, n_candidates)
+
+
+@register_strategy('basket', requires=('basket_partners',))
+def basket_scores(user, snapshot):
+    """Items most often ordered together with what the user already ordered."""
+    return _allowed_scores(snapshot, _pairs_to_scores(snapshot.basket_partners))
+
+
+@register_strategy('content', requires=('content_model', 'trending_items'))
+def content_scores(user, snapshot):
+    """Catalog items closest in TF-IDF space to the user's two favourite categories."""
+    user_categories = snapshot.category_affinity.most_common()
+
+    if not user_categories:
+        return _top_scores(*_allowed_scores(snapshot, _pairs_to_scores(snapshot.trending_items)), 10)
+
+    content_model = snapshot.content_model
+    content_matrix = content_model.matrix
+
+    # Find similar items based on content
+    preferred_categories = [category for category, _ in user_categories[:2]]
+
+    similar_matrix = content_matrix[content_model.rows_in_categories(preferred_categories)]
+
+    content_similarities = np.asarray(cosine_similarity(content_matrix, similar_matrix).mean(axis=1)).ravel()
+    content_similarities[~snapshot.allowed(content_model.item_ids)] = -np.inf
+
+    return _top_scores(content_model.item_ids, content_similarities, 10)
+
+
+@register_strategy('popularity', requires=('popular_items',))
+def popularity_scores(user, snapshot):
+    return _top_scores(*_allowed_scores(snapshot, _pairs_to_scores(snapshot.popular_items)), 10)
+
+
+@register_strategy('trending', requires=('trending_now',))
+def trending_scores(user, snapshot):
+    """Best sellers of the last ``TRENDING_WINDOW_MINUTES`` minutes in this process."""
+    return _top_scores(*_allowed_scores(snapshot, _pairs_to_scores(snapshot.trending_now)), 10)
+
+
+_strategy_executor = None
+_strategy_executor_lock = threading.Lock()
+
+
+def get_strategy_executor():
+    """Shared, bounded thread pool that runs independent strategies side by side."""
+    global _strategy_executor
+
+    if _strategy_executor is None:
+        with _strategy_executor_lock:
+            if _strategy_executor is None:
+                _strategy_executor = ThreadPoolExecutor(
+                    max_workers=recommender_setting('STRATEGY_WORKERS'),
+                    thread_name_prefix='recommender'
+                )
+    return _strategy_executor
+
+
+class RestaurantRecommender:
+    """Recommendation engine: runs registered strategies and fuses their scores.
+
+    ``strategies`` selects registry entries by name and defaults to
+    ``RECOMMENDER['STRATEGIES']``.
+    """
+
+    def __init__(self, user, Order, OrderItem, FoodItem, strategies=None):
+        self.user = user
+        self.Order = Order
+        self.OrderItem = OrderItem
+        self.FoodItem = FoodItem
+        self.strategies = resolve_strategies(strategies)
+        self.timings = {}
+        self._snapshot = None
+
+    @property
+    def snapshot(self):
+        if self._snapshot is None:
+            started = time.perf_counter()
+            self._snapshot = UserSnapshot(self.user, self.OrderItem, self.FoodItem)
+            self.timings['snapshot'] = (time.perf_counter() - started) * 1000
+        return self._snapshot
+
+    def score(self, name):
+        """``(food_item_ids, scores)`` from one registered strategy."""
+        return STRATEGIES[name].score(self.user, self.snapshot)
+
+    def collaborative_filtering(self):
+        return _ranked_ids(self.score('user_cf'))
+
+    def content_based_filtering(self):
+        return _ranked_ids(self.score('content'))
+
+    def item_neighbor_based(self):
+        return _ranked_ids(self.score('item_cf'))
 
     def popularity_based(self):
-        popular_items = (
-            self.OrderItem.objects
-            .values('food_item')
-            .annotate(total_quantity=Sum('quantity'))
-            .order_by('-total_quantity')[:10]
+        return _ranked_ids(self.score('popularity'))
+
+    def _run_strategies(self, names):
+        """Run the named strategies concurrently, recording each one's wall time in ms."""
+        snapshot = self.snapshot
+        snapshot.prefetch(
+            source for name in names for source in STRATEGIES[name].requires
         )
 
-        return [item['food_item'] for item in popular_items]
+        def timed(name):
+            started = time.perf_counter()
+            result = STRATEGIES[name].score(self.user, snapshot)
+            return name, result, (time.perf_counter() - started) * 1000
+
+        futures = [get_strategy_executor().submit(timed, name) for name in names]
+        results = {}
+        for future in futures:
+            name, result, elapsed = future.result()
+            results[name] = result
+            self.timings[name] = elapsed
+        return results
 
     def get_recommendations(self, n_recommendations=10):
-        collaborative_recs = self.collaborative_filtering()
-        content_recs = self.content_based_filtering()
-        popular_recs = self.popularity_based()
-
-        all_recommendations = list(set(
-            collaborative_recs +
-            content_recs +
-            popular_recs
-        ))
-
-        existing_orders = set(
-            self.OrderItem.objects
-            .filter(order__customer=self.user)
-            .values_list('food_item_id', flat=True)
-        )
+        """Fuse the selected strategies' scores and return the top item ids, best first."""
+        snapshot = self.snapshot
+        strategy_scores = self._run_strategies(self.strategies)
 
-        recommendations = [
-            rec for rec in all_recommendations
-            if rec not in existing_orders
-        ]
+        started = time.perf_counter()
+        ranker = HybridRanker(snapshot.catalog.item_ids, recommender_setting('STRATEGY_WEIGHTS'))
+        recommendations = ranker.rank(strategy_scores, ~snapshot.candidate_mask, n_recommendations)
+        self.timings['ranking'] = (time.perf_counter() - started) * 1000
 
-        return recommendations[:n_recommendations]
+        return recommendations
@@ -0,0 +1,245 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+from .catalog import get_catalog_version
+from .content import content_vectorizer
+
+# Most vocabulary terms a trailing prefix expands to
+MAX_PREFIX_TERMS = 50
+
+TRAILING_WORD = re.compile(r'\w+$')
+
+
+class SearchIndex:
+    """Inverted index over the food catalog's name, description and category.
+
+    Every term maps to a posting list of ``{food_item_id: weight}``, where
+    the weight is the term's L2-normalised frequency in that item; the IDF
+    is applied at query time from the posting list length, so indexing one
+    item never rewrites another item's postings. Items are tokenized by the
+    content model's analyzer. ``version`` is the catalog version the index
+    is current for, and ``watermark`` the newest ``updated_at`` seen.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.watermark = None
+        analyzer = content_vectorizer()
+        self._analyze = analyzer.build_analyzer()
+        self._preprocess = analyzer.build_preprocessor()
+        self._tokenize = analyzer.build_tokenizer()
+        self._stop_words = analyzer.get_stop_words() or frozenset()
+
+        self._item_terms = {}
+        self._postings = {}
+        self._vocabulary = []
+        # Items live in dense slots so queries accumulate into flat arrays
+        self._slots = {}
+        self._slot_item_ids = np.empty(0, dtype=np.int64)
+        self._free_slots = []
+        self._compiled = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_food_items(cls, FoodItem, version=None):
+        index = cls(version=version)
+        index.refresh(FoodItem)
+        return index
+
+    def __len__(self):
+        return len(self._item_terms)
+
+    def add(self, food_item_id, text):
+        """Index (or re-index) one item's ``text``."""
+        counts = Counter(self._analyze(text))
+        norm = math.sqrt(sum(count * count for count in counts.values())) or 1.0
+        terms = {term: count / norm for term, count in counts.items()}
+
+        with self._lock:
+            self.remove(food_item_id)
+            self._item_terms[food_item_id] = terms
+            self._assign_slot(food_item_id)
+            for term, weight in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[food_item_id] = weight
+                self._compiled.pop(term, None)
+
+    def remove(self, food_item_id):
+        with self._lock:
+            terms = self._item_terms.pop(food_item_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings[term]
+                del postings[food_item_id]
+                if not postings:
+                    del self._postings[term]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+                self._compiled.pop(term, None)
+            self._free_slots.append(self._slots.pop(food_item_id))
+
+    def _assign_slot(self, food_item_id):
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slots)
+            if slot >= len(self._slot_item_ids):
+                grown = np.empty(max(2 * len(self._slot_item_ids), 1024), dtype=np.int64)
+                grown[:len(self._slot_item_ids)] = self._slot_item_ids
+                self._slot_item_ids = grown
+        self._slots[food_item_id] = slot
+        self._slot_item_ids[slot] = food_item_id
+
+    def refresh(self, FoodItem):
+        """Re-index items updated since the watermark and drop deleted ones."""
+        rows = FoodItem.objects.values_list('id', 'name', 'description', 'category', 'updated_at')
+        if self.watermark is not None:
+            rows = rows.filter(updated_at__gte=self.watermark)
+
+        with self._lock:
+            for food_item_id, name, description, category, updated_at in rows.iterator():
+                # Same fields as ContentModel
+                self.add(food_item_id, f'{name} {description} {category}')
+                if self.watermark is None or updated_at > self.watermark:
+                    self.watermark = updated_at
+            existing = set(FoodItem.objects.values_list('id', flat=True).iterator())
+            for food_item_id in [food_item_id for food_item_id in self._item_terms if food_item_id not in existing]:
+                self.remove(food_item_id)
+
+    def _posting_arrays(self, term):
+        """``(slots, weights)`` of a term's posting list by descending weight, compiled on first use."""
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = sorted(self._postings[term].items(), key=lambda posting: (-posting[1], posting[0]))
+            slots = np.fromiter((self._slots[food_item_id] for food_item_id, _ in postings), dtype=np.int64, count=len(postings))
+            weights = np.fromiter((weight for _, weight in postings), dtype=np.float64, count=len(postings))
+            compiled = self._compiled[term] = (slots, weights)
+        return compiled
+
+    def idf(self, term):
+        return math.log((1 + len(self._item_terms)) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query, n=10):
+        """``(food_item_id, score)`` of the ``n`` best items matching every term of ``query``.
+
+        Unless ``query`` ends with whitespace its last word is still being
+        typed and matches as a prefix of any indexed term, once it is long
+        enough to be a token itself.
+        """
+        text = self._preprocess(query)
+        prefix = None
+        if not query[-1:].isspace():
+            # Split the raw trailing word off before tokenizing, as the
+            # tokenizer drops words that are too short ("m" in "pizza m")
+            match = TRAILING_WORD.search(text)
+            if match is not None:
+                text, prefix = text[:match.start()], match.group()
+        words = self._tokenize(text)
+        groups = [[term] for term in dict.fromkeys(words) if term not in self._stop_words]
+        if prefix is not None and self._tokenize(prefix) == [prefix]:
+            groups.append(self._prefix_terms(prefix))
+        if not groups or n < 1:
+            return []
+
+        with self._lock:
+            groups = [[term for term in terms if term in self._postings] for terms in groups]
+            if not all(groups):
+                return []
+            limit = n if len(groups) == 1 else None
+            groups = sorted((self._group_postings(terms, limit) for terms in groups), key=lambda group: len(group[0]))
+
+            # Score the smallest group's items against every other group,
+            # touching only posting entries, never the whole catalog
+            candidates, scores, unique = groups[0]
+            if not unique:
+                candidates, scores = _best_per_slot(candidates, scores)
+            if len(groups) > 1:
+                group_scores = np.zeros(len(self._slots) + len(self._free_slots))
+                for slots, weights, unique in groups[1:]:
+                    if unique:
+                        group_scores[slots] = weights
+                    else:
+                        np.maximum.at(group_scores, slots, weights)
+                    found = group_scores[candidates]
+                    hit = found > 0
+                    candidates, scores = candidates[hit], scores[hit] + found[hit]
+                    group_scores[slots] = 0
+
+            if len(candidates) > n:
+                top = np.argpartition(-scores, n - 1)[:n]
+                candidates, scores = candidates[top], scores[top]
+            item_ids = self._slot_item_ids[candidates]
+            order = np.lexsort((item_ids, -scores))
+            return list(zip(item_ids[order].tolist(), scores[order].tolist()))
+
+    def _group_postings(self, terms, limit=None):
+        """``(slots, scores, unique)`` of the postings of any of ``terms``.
+
+        A slot repeats (``unique`` is false) when it holds several of the
+        terms. Posting lists are in descending weight order, so when only the
+        top ``limit`` items are wanted each term's first ``limit`` entries
+        suffice.
+        """
+        postings = []
+        for term in terms:
+            slots, weights = self._posting_arrays(term)
+            postings.append((slots[:limit], weights[:limit] * self.idf(term)))
+        if len(postings) == 1:
+            return postings[0] + (True,)
+        return (
+            np.concatenate([slots for slots, _ in postings]),
+            np.concatenate([scores for _, scores in postings]),
+            False,
+        )
+
+
+def _best_per_slot(slots, scores):
+    """Deduplicate ``slots``, keeping each one's highest score."""
+    order = np.lexsort((-scores, slots))
+    slots, scores = slots[order], scores[order]
+    first = np.ones(len(slots), dtype=bool)
+    first[1:] = slots[1:] != slots[:-1]
+    return slots[first], scores[first]
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index(FoodItem):
+    """Return the catalog search index, re-indexing changed items when the catalog version moved."""
+    global _search_index
+
+    version = get_catalog_version()
+    if _search_index is None or _search_index.version != version:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex.from_food_items(FoodItem, version=version)
+            elif _search_index.version != version:
+                _search_index.refresh(FoodItem)
+                _search_index.version = version
+    return _search_index
+
+
+def reset_search_index():
+    global _search_index
+
+    with _search_index_lock:
+        _search_index = None
@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import User, FoodItem, Order, OrderItem
+from .signals import record_order_items
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -32,12 +34,40 @@ class FoodItemSerializer(serializers.ModelSerializer):
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    # Plain ids; OrderSerializer resolves every line's item in one query
+    food_item = serializers.IntegerField(source='food_item_id')
+
     class Meta:
         model = OrderItem
         fields = ('food_item', 'quantity', 'price')
         read_only_fields = ('price',)
 
 
+def order_line_errors(items_data, food_items):
+    """Per-line errors for ``items_data`` whose item is missing from ``food_items`` or unavailable."""
+    errors = {}
+    for index, item_data in enumerate(items_data):
+        food_item = food_items.get(item_data['food_item_id'])
+        if food_item is None:
+            errors[index] = {'food_item': [f"Invalid pk \"{item_data['food_item_id']}\" - object does not exist."]}
+        elif not food_item.is_available:
+            errors[index] = {'food_item': [f'{food_item.name} is not available.']}
+    return errors
+
+
+def build_order_items(items_data, food_items):
+    """``(total_price, order_items)`` for validated lines, priced from ``food_items``."""
+    total_price = 0
+    order_items = []
+    for item_data in items_data:
+        food_item = food_items[item_data['food_item_id']]
+        quantity = item_data['quantity']
+        price = food_item.price * quantity
+        total_price += price
+        order_items.append(OrderItem(food_item=food_item, quantity=quantity, price=price))
+    return total_price, order_items
+
+
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, source='orderitem_set')
 
@@ -46,24 +76,29 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ('id', 'customer', 'items', 'total_price', 'status', 'created_at')
         read_only_fields = ('customer', 'total_price')
 
+    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop('orderitem_set')
-        order = Order.objects.create(total_price=0, **validated_data)
-
-        total_price = 0
-        for item_data in items_data:
-            food_item = item_data['food_item']
-            quantity = item_data['quantity']
-            price = food_item.price * quantity
-            total_price += price
-
-            OrderItem.objects.create(
-                order=order,
-                food_item=food_item,
-                quantity=quantity,
-                price=price
-            )
-
-        order.total_price = total_price
-        order.save()
-        return order
\ No newline at end of file
+        food_items = FoodItem.objects.select_for_update().in_bulk(
+            {item_data['food_item_id'] for item_data in items_data}
+        )
+        errors = order_line_errors(items_data, food_items)
+        if errors:
+            raise serializers.ValidationError({'items': errors})
+
+        total_price, order_items = build_order_items(items_data, food_items)
+        order = Order.objects.create(total_price=total_price, **validated_data)
+        for order_item in order_items:
+            order_item.order = order
+        OrderItem.objects.bulk_create(order_items)
+
+        # bulk_create skips post_save, so the counters are fed here
+        record_order_items(order_items)
+        return order
+
+
+class BulkOrderSerializer(serializers.Serializer):
+    """One order of a POS upload; ids are resolved a chunk at a time by ``ingest_orders``."""
+    customer = serializers.IntegerField()
+    items = OrderItemSerializer(many=True, allow_empty=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .baskets import record_basket_items, record_baskets
+from .catalog import bump_catalog_version
+from .interactions import refresh_users
+from .models import FoodItem, FoodItemStats, OrderItem, UserProfile
+from .popularity import record_sales
+from .profiles import rebuild_user_profiles, record_customer_purchases, record_purchases
+from .trending import get_trending_counter
+
+
+@receiver(post_save, sender=OrderItem)
+def count_food_item_sale(sender, instance, created, **kwargs):
+    """Bump the item's popularity counters in the same transaction as the sale."""
+    if created:
+        record_sales({instance.food_item_id: instance.quantity})
+
+
+@receiver(post_save, sender=OrderItem)
+def count_basket_pairs(sender, instance, created, **kwargs):
+    """Pair the new line's item with the rest of its order in the co-occurrence table."""
+    if created:
+        basket = (
+            OrderItem.objects
+            .filter(order_id=instance.order_id)
+            .exclude(pk=instance.pk)
+            .values_list('food_item_id', flat=True)
+        )
+        record_basket_items([instance.food_item_id], basket)
+
+
+@receiver(post_save, sender=OrderItem)
+def update_customer_profile(sender, instance, created, **kwargs):
+    """Fold the purchase into the customer's taste profile in the same transaction."""
+    if created:
+        order = instance.order
+        record_purchases(order.customer_id, {instance.food_item.category: instance.quantity}, order.created_at)
+
+
+def record_order_items(order_items):
+    """Apply the OrderItem ``post_save`` bookkeeping to rows inserted with ``bulk_create``.
+
+    ``order_items`` may span several orders. In the caller's transaction,
+    popularity and basket counters and taste profiles are updated
+    set-based, in a fixed number of queries however many items, pairs and
+    customers; the customers' interaction rows and the trending feed are
+    refreshed on commit.
+    """
+    quantities = defaultdict(int)
+    baskets = defaultdict(set)
+    categories = defaultdict(lambda: defaultdict(int))
+    last_order_at = {}
+    for order_item in order_items:
+        order = order_item.order
+        quantities[order_item.food_item_id] += order_item.quantity
+        baskets[order.pk].add(order_item.food_item_id)
+        categories[order.customer_id][order_item.food_item.category] += order_item.quantity
+        last_order_at[order.customer_id] = max(order.created_at, last_order_at.get(order.customer_id, order.created_at))
+
+    record_sales(quantities)
+    record_baskets(baskets.values())
+    record_customer_purchases({
+        customer_id: (customer_categories, last_order_at[customer_id])
+        for customer_id, customer_categories in categories.items()
+    })
+    customer_ids = list(categories)
+
+    def refresh():
+        refresh_users(OrderItem, customer_ids)
+        get_trending_counter().record(quantities)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_delete, sender=OrderItem)
+def rebuild_customer_profile(sender, instance, **kwargs):
+    customer_id = instance.order.customer_id
+    transaction.on_commit(lambda: rebuild_user_profiles(OrderItem, UserProfile, user_ids=[customer_id]))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_customer_interactions(sender, instance, **kwargs):
+    """Patch the ordering customer's row in the cached interaction matrix."""
+    customer_id = instance.order.customer_id
+    transaction.on_commit(lambda: refresh_users(OrderItem, [customer_id]))
+
+
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+def bump_catalog_on_change(sender, instance, **kwargs):
+    """Invalidate catalog-derived models such as the fitted TF-IDF vectors."""
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=FoodItem)
+def create_food_item_stats(sender, instance, created, **kwargs):
+    if created:
+        FoodItemStats.objects.get_or_create(food_item=instance)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from .conf import recommender_setting
+from .interactions import normalize_rows
+
+
+def tile_shape(n_queries, n_candidates, k, memory_budget=None):
+    """``(query_rows, candidate_rows)`` per tile so one tile stays within the budget.
+
+    A tile holds a dense float32 block of similarities plus the running top-k
+    indices and scores it is merged into.
+    """
+    if memory_budget is None:
+        memory_budget = recommender_setting('SIMILARITY_MEMORY_BUDGET_MB') * 1024 * 1024
+    query_rows = max(1, min(n_queries, 1024))
+    # float32 tile + int64/float32 merge buffers of width (k + candidate_rows)
+    bytes_per_column = query_rows * (4 + 8 + 4)
+    candidate_rows = max(1, memory_budget // bytes_per_column - k)
+    return query_rows, min(candidate_rows, max(n_candidates, 1))
+
+
+def blockwise_top_k(queries, candidates, k, exclude=None, memory_budget=None, normalized=False):
+    """Top ``k`` cosine neighbours among ``candidates`` for every row of ``queries``.
+
+    Similarities are computed tile by tile and merged into a running top-k
+    with ``argpartition``, so peak memory is bounded by ``memory_budget``
+    bytes however many rows there are. ``exclude`` optionally gives, per query
+    row, one candidate position to skip (e.g. the query itself). Returns
+    ``(positions, scores)`` of shape ``(n_queries, k)``, best first, padded
+    with ``-1``/``-inf``.
+    """
+    if not normalized:
+        queries = normalize_rows(queries)
+        candidates = normalize_rows(candidates)
+    n_queries, n_candidates = queries.shape[0], candidates.shape[0]
+    k = min(k, n_candidates)
+
+    positions = np.full((n_queries, k), -1, dtype=np.int64)
+    scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    if k == 0:
+        return positions, scores
+
+    query_rows, candidate_rows = tile_shape(n_queries, n_candidates, k, memory_budget)
+    candidates_t = candidates.T.tocsc()
+
+    for query_start in range(0, n_queries, query_rows):
+        query_stop = min(query_start + query_rows, n_queries)
+        block = queries[query_start:query_stop]
+        best_positions = positions[query_start:query_stop]
+        best_scores = scores[query_start:query_stop]
+
+        for candidate_start in range(0, n_candidates, candidate_rows):
+            candidate_stop = min(candidate_start + candidate_rows, n_candidates)
+            tile = (block @ candidates_t[:, candidate_start:candidate_stop]).toarray().astype(np.float32)
+            tile_positions = np.arange(candidate_start, candidate_stop)
+
+            if exclude is not None:
+                excluded = exclude[query_start:query_stop] - candidate_start
+                hit = np.flatnonzero((excluded >= 0) & (excluded < tile.shape[1]))
+                tile[hit, excluded[hit]] = -np.inf
+
+            merged_scores = np.concatenate([best_scores, tile], axis=1)
+            merged_positions = np.concatenate(
+                [best_positions, np.broadcast_to(tile_positions, tile.shape)], axis=1
+            )
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_positions = np.take_along_axis(merged_positions, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_positions = np.take_along_axis(best_positions, order, axis=1)
+        scores[query_start:query_stop] = best_scores
+        positions[query_start:query_stop] = np.where(np.isfinite(best_scores), best_positions, -1)
+
+    return positions, scores
@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.utils import timezone
+
+from .conf import recommender_setting
+from .interactions import InteractionMatrix
+
+# Timestamps are stored as int32 seconds from this landmark, good until 2068
+STORE_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+COLUMNS = {
+    'user_ids': np.int32,
+    'item_ids': np.int32,
+    'quantities': np.float32,
+    'timestamps': np.int32,
+}
+
+
+def interaction_store_path():
+    return os.path.join(recommender_setting('ARTIFACT_DIR'), 'interactions')
+
+
+class InteractionStore:
+    """Append-only columnar copy of the order history.
+
+    Each column of ``(user_id, item_id, quantity, timestamp)`` is a raw
+    int32/float32 file, so loading N interactions is four sequential reads
+    (or memory maps) of 16 bytes per row and creates no Python objects per
+    row. ``meta.json`` records how many rows are committed and the highest
+    ``OrderItem`` id already copied; ``append_new`` copies rows above that
+    watermark. Updated or deleted order items, and rows committed out of id
+    order after a sync, are only picked up by a ``rebuild``.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or interaction_store_path()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.bin')
+
+    @property
+    def meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as meta:
+                return json.load(meta)
+        except FileNotFoundError:
+            return {'rows': 0, 'watermark': 0}
+
+    def _write_meta(self, rows, watermark):
+        staging = os.path.join(self.path, 'meta.json.tmp')
+        with open(staging, 'w') as meta:
+            json.dump({'rows': rows, 'watermark': watermark}, meta)
+        os.replace(staging, os.path.join(self.path, 'meta.json'))
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def append_new(self, OrderItem, chunk_size=100000):
+        """Copy order items above the watermark; returns the number of rows added."""
+        os.makedirs(self.path, exist_ok=True)
+        meta = self.meta
+        rows, watermark = meta['rows'], meta['watermark']
+
+        # Drop whatever an interrupted append left past the committed rows
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), 'ab') as column:
+                column.truncate(rows * np.dtype(dtype).itemsize)
+
+        queryset = (
+            OrderItem.objects
+            .filter(id__gt=watermark)
+            .order_by('id')
+            .values_list('id', 'order__customer_id', 'food_item_id', 'quantity', 'order__created_at')
+        )
+        added = 0
+        chunk = []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                watermark = self._write_chunk(chunk)
+                added += len(chunk)
+                chunk = []
+        if chunk:
+            watermark = self._write_chunk(chunk)
+            added += len(chunk)
+
+        if added:
+            self._write_meta(rows + added, watermark)
+        return added
+
+    def _write_chunk(self, chunk):
+        ids, user_ids, item_ids, quantities, created = zip(*chunk)
+        columns = {
+            'user_ids': user_ids,
+            'item_ids': item_ids,
+            'quantities': quantities,
+            'timestamps': [(timestamp - STORE_EPOCH).total_seconds() for timestamp in created],
+        }
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), 'ab') as column:
+                np.asarray(columns[name], dtype=dtype).tofile(column)
+        return ids[-1]
+
+    def rebuild(self, OrderItem, chunk_size=100000):
+        """Recreate the store from scratch; readers keep the old copy until it is swapped in."""
+        staging = InteractionStore(f'{self.path}.rebuild')
+        shutil.rmtree(staging.path, ignore_errors=True)
+        added = staging.append_new(OrderItem, chunk_size=chunk_size)
+        if not added:
+            staging._write_meta(0, 0)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.rename(staging.path, self.path)
+        return added
+
+    def columns(self, mmap=True):
+        """``{name: array}`` of the committed rows, memory-mapped read-only by default."""
+        rows = len(self)
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            elif mmap:
+                columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(rows,))
+            else:
+                columns[name] = np.fromfile(self._column_path(name), dtype=dtype, count=rows)
+        return columns
+
+
+def load_interactions(OrderItem, window_days=None):
+    """Bring the store up to date and return its rows as an ``InteractionMatrix``.
+
+    Only interactions from the last ``window_days`` days are used
+    (default ``INTERACTION_WINDOW_DAYS``; ``None`` keeps everything).
+    """
+    if window_days is None:
+        window_days = recommender_setting('INTERACTION_WINDOW_DAYS')
+
+    store = InteractionStore()
+    store.append_new(OrderItem)
+    columns = store.columns()
+    if window_days:
+        cutoff = (timezone.now() - timedelta(days=window_days) - STORE_EPOCH).total_seconds()
+        recent = columns['timestamps'] >= cutoff
+        columns = {name: column[recent] for name, column in columns.items()}
+    return InteractionMatrix.from_columns(columns['user_ids'], columns['item_ids'], columns['quantities'])
@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from restaurant_app.artifacts import reset_artifact_bundle
+from restaurant_app.caches import recommendation_cache
+from restaurant_app.catalog import reset_catalog_index, reset_catalog_snapshots
+from restaurant_app.content import reset_content_model
+from restaurant_app.factors import reset_latent_factors
+from restaurant_app.interactions import reset_interaction_matrix
+from restaurant_app.models import FoodItem, Order, OrderItem
+from restaurant_app.neighbors import reset_item_neighbors
+from restaurant_app.popularity import reset_top_lists
+from restaurant_app.search import reset_search_index
+from restaurant_app.trending import reset_trending_counter
+
+
+def _reset():
+    for backend in caches.all():
+        backend.clear()
+    recommendation_cache.reset_stats()
+    reset_interaction_matrix()
+    reset_artifact_bundle()
+    reset_item_neighbors()
+    reset_latent_factors()
+    reset_content_model()
+    reset_catalog_index()
+    reset_catalog_snapshots()
+    reset_top_lists()
+    reset_search_index()
+    reset_trending_counter()
+
+
+@pytest.fixture(autouse=True)
+def reset_recommender_caches(settings, tmp_path):
+    # Process-wide recommender state must not leak between tests
+    settings.RECOMMENDER = {'ARTIFACT_DIR': tmp_path / 'artifacts'}
+    _reset()
+    yield
+    _reset()
+
+
+Menu = namedtuple('Menu', ['pizza', 'pasta', 'burger', 'fries', 'cola', 'salad'])
+
+
+@pytest.fixture
+def customer():
+    return get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+
+
+@pytest.fixture
+def menu():
+    return Menu(
+        FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99, category="Italian"),
+        FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99, category="Italian"),
+        FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99, category="American"),
+        FoodItem.objects.create(name="Fries", description="Salted fries", price=3.99, category="Sides"),
+        FoodItem.objects.create(name="Cola", description="Cold cola", price=1.99, category="Drinks"),
+        FoodItem.objects.create(name="Salad", description="Green salad", price=6.99, category="Healthy"),
+    )
+
+
+@pytest.fixture
+def place_order():
+    """``place_order(customer, lines)``, a line being ``(food_item, quantity)`` or a food item bought once."""
+    def place(customer, lines):
+        order = Order.objects.create(customer=customer, total_price=0)
+        for line in lines:
+            food_item, quantity = line if isinstance(line, tuple) else (line, 1)
+            OrderItem.objects.create(order=order, food_item=food_item, quantity=quantity, price=food_item.price)
+        return order
+    return place
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from restaurant_app.ann import RandomProjectionIndex, neighbor_recall
+from restaurant_app.interactions import InteractionMatrix
+
+
+def clustered_matrix(n_clusters=20, users_per_cluster=30, n_items=400, seed=1):
+    # Users in a cluster order from the same small set of items
+    rng = np.random.default_rng(seed)
+    rows = []
+    for cluster in range(n_clusters):
+        items = rng.choice(n_items, size=8, replace=False)
+        for _ in range(users_per_cluster):
+            row = np.zeros(n_items, dtype=np.float32)
+            row[rng.choice(items, size=5, replace=False)] = rng.integers(1, 4, size=5)
+            rows.append(row)
+    matrix = sparse.csr_matrix(np.array(rows))
+    return InteractionMatrix(np.arange(1, matrix.shape[0] + 1), np.arange(1, n_items + 1), matrix)
+
+
+def test_identical_vectors_share_buckets():
+    vectors = sparse.csr_matrix(np.array([[1, 2, 0], [2, 4, 0], [0, 0, 5]], dtype=np.float32))
+    index = RandomProjectionIndex(3, n_tables=4, n_bits=8).fit(vectors)
+    assert {0, 1} <= set(index.candidates(vectors[0]).tolist())
+
+
+def test_lsh_search_scores_a_fraction_of_users_with_high_recall():
+    interactions = clustered_matrix()
+
+    candidates = interactions.ann_candidates(0)
+    assert len(candidates) < interactions.n_users / 4
+    assert neighbor_recall(interactions, np.arange(0, interactions.n_users, 7), k=5) >= 0.85
+
+
+def test_rows_updated_after_indexing_are_still_found():
+    interactions = clustered_matrix()
+    interactions.ann_candidates(0)
+
+    columns, quantities = interactions.user_row(0)
+    interactions.update_user(10 ** 6, interactions.item_ids[columns], quantities)
+
+    rows, similarities = interactions.nearest_users(0, k=1, approximate=True)
+    assert interactions.user_ids[rows[0]] == 10 ** 6
+    assert similarities[0] == pytest.approx(1.0)
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from restaurant_app.artifacts import bundles_dir, get_artifact_bundle, publish_bundle
+from restaurant_app.content import ContentModel, get_content_model, reset_content_model
+from restaurant_app.models import FoodItem, OrderItem, Order
+from restaurant_app.neighbors import get_item_neighbors
+
+
+def test_publish_carries_over_arrays_and_workers_pick_up_new_bundles():
+    assert get_artifact_bundle() is None
+
+    first = publish_bundle({'a': np.arange(3, dtype=np.int32), 'b': np.ones(2, dtype=np.float32)})
+    bundle = get_artifact_bundle()
+    assert bundle.version == first.version
+    assert isinstance(bundle.array('a'), np.memmap)
+    assert get_artifact_bundle() is bundle
+
+    second = publish_bundle({'a': np.arange(5, dtype=np.int32)})
+    reloaded = get_artifact_bundle()
+    assert reloaded.version == second.version
+    assert reloaded.array('a').tolist() == [0, 1, 2, 3, 4]
+    assert reloaded.array('b').tolist() == [1.0, 1.0]
+    # The old bundle stays readable for workers that still have it open
+    assert bundle.array('a').tolist() == [0, 1, 2]
+
+
+def test_publish_keeps_only_the_newest_bundles():
+    for size in range(4):
+        latest = publish_bundle({'a': np.zeros(size)}, keep=2)
+
+    versions = sorted(name for name in os.listdir(bundles_dir()) if not name.startswith('.') and name != 'CURRENT')
+    assert len(versions) == 2
+    assert versions[-1] == latest.version
+
+
+@pytest.mark.django_db
+def test_bundle_serves_content_model_and_neighbors_until_catalog_changes(django_capture_on_commit_callbacks):
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99, category="Italian")
+    calzone = FoodItem.objects.create(name="Calzone", description="Folded cheese pizza", price=12.99, category="Italian")
+    order = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=pizza.price)
+
+    fitted = ContentModel.from_food_items(FoodItem)
+    call_command('build_recommender_bundle', factors=1, k=1)
+    # As seen by a freshly started worker
+    reset_content_model()
+
+    model = get_content_model(FoodItem)
+    # Read-only views of the memory-mapped arrays, not copies
+    assert not model.matrix.data.flags.writeable
+    assert np.allclose(model.matrix.toarray(), fitted.matrix.toarray())
+    assert np.allclose(
+        model.vectorizer.transform(['cheese pizza']).toarray(),
+        fitted.vectorizer.transform(['cheese pizza']).toarray()
+    )
+    assert get_item_neighbors(FoodItem, OrderItem).neighbors(pizza.id)[0].tolist() == [calzone.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99, category="American")
+    assert get_content_model(FoodItem).matrix.data.flags.writeable
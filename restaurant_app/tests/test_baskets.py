@@ -0,0 +1,83 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from restaurant_app.baskets import basket_total, bought_together, record_baskets
+from restaurant_app.models import FoodItem, FoodItemStats, ItemPairCount, Order, OrderItem
+from restaurant_app.recommender import RestaurantRecommender
+
+
+def pair_counts():
+    return set(ItemPairCount.objects.values_list('food_item_id', 'other_id', 'count'))
+
+
+@pytest.mark.django_db
+def test_new_orders_update_pairs_like_a_full_rebuild(customer, menu, place_order):
+    burger, fries, cola, salad = menu.burger, menu.fries, menu.cola, menu.salad
+    place_order(customer, [burger, fries, cola])
+    place_order(customer, [burger, fries, fries])
+    place_order(customer, [salad])
+
+    incremental = pair_counts()
+    assert (burger.id, fries.id, 2) in incremental
+    assert (fries.id, burger.id, 2) in incremental
+    assert FoodItemStats.objects.get(food_item=fries).basket_count == 2
+
+    assert basket_total() == 3
+
+    call_command('rebuild_item_pairs')
+    assert pair_counts() == incremental
+    assert FoodItemStats.objects.get(food_item=fries).basket_count == 2
+    assert basket_total() == 3
+
+
+@pytest.mark.django_db
+def test_record_baskets_runs_a_fixed_number_of_queries(menu, django_assert_num_queries):
+    burger, fries, cola, salad = menu.burger, menu.fries, menu.cola, menu.salad
+    record_baskets([[burger.id, fries.id]])
+
+    # Basket counts, the total, the pair lookup, the pair update and the
+    # insert with its savepoint, however many items and pairs
+    with django_assert_num_queries(7):
+        record_baskets([[burger.id, fries.id, cola.id], [salad.id, cola.id]])
+
+    assert pair_counts() == {
+        (burger.id, fries.id, 2), (fries.id, burger.id, 2),
+        (burger.id, cola.id, 1), (cola.id, burger.id, 1),
+        (fries.id, cola.id, 1), (cola.id, fries.id, 1),
+        (salad.id, cola.id, 1), (cola.id, salad.id, 1),
+    }
+    assert basket_total() == 3
+
+
+@pytest.mark.django_db
+def test_bought_together_reports_support_and_lift(customer, menu, place_order):
+    burger, fries, cola, salad = menu.burger, menu.fries, menu.cola, menu.salad
+    place_order(customer, [burger, fries, cola])
+    place_order(customer, [burger, fries])
+    place_order(customer, [cola])
+    place_order(customer, [salad])
+
+    fries_pair, cola_pair = bought_together(burger.id)
+    assert fries_pair['food_item_id'] == fries.id
+    assert fries_pair['support'] == pytest.approx(2 / 4)
+    assert fries_pair['confidence'] == pytest.approx(1.0)
+    assert fries_pair['lift'] == pytest.approx(2.0)
+    assert cola_pair['lift'] == pytest.approx(1.0)
+
+    client = APIClient()
+    client.force_authenticate(user=customer)
+    response = client.get(f'/api/food-items/{burger.id}/bought-together/')
+    assert [item['id'] for item in response.data] == [fries.id, cola.id]
+    assert response.data[0]['count'] == 2
+
+
+@pytest.mark.django_db
+def test_basket_strategy_proposes_partners_of_ordered_items(customer, menu, place_order):
+    burger, fries, cola, salad = menu.burger, menu.fries, menu.cola, menu.salad
+    other = get_user_model().objects.create_user(username="bob", email="bob@example.com", password="password123")
+    place_order(other, [burger, cola])
+    place_order(customer, [burger])
+
+    recommender = RestaurantRecommender(customer, Order, OrderItem, FoodItem, strategies=['basket'])
+    assert recommender.get_recommendations() == [cola.id]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+from restaurant_app.artifacts import publish_bundle
+from restaurant_app.caches import recommendation_cache
+from restaurant_app.models import FoodItem, OrderItem, Order
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def menu(customer):
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99, category="Italian")
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99, category="Italian")
+    order = Order.objects.create(customer=customer, total_price=pizza.price)
+    OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=pizza.price)
+    return pizza, pasta
+
+
+@pytest.mark.django_db
+def test_cache_hit_costs_one_query(client, customer, menu, django_assert_num_queries):
+    client.force_authenticate(user=customer)
+    first = client.get('/api/recommendations/')
+    assert 'user_cf;dur=' in first['Server-Timing']
+
+    with django_assert_num_queries(1):
+        second = client.get('/api/recommendations/')
+
+    assert second.status_code == status.HTTP_200_OK
+    assert [item['id'] for item in second.data] == [item['id'] for item in first.data]
+    assert recommendation_cache.stats()['hits'] == 1
+    assert recommendation_cache.stats()['misses'] == 1
+
+
+@pytest.mark.django_db
+def test_placing_an_order_invalidates_only_that_user(client, customer, menu):
+    pizza, pasta = menu
+    recommendation_cache.set(customer.id, [pasta.id])
+    recommendation_cache.set(customer.id + 1, [pasta.id])
+
+    client.force_authenticate(user=customer)
+    response = client.post('/api/orders/', {'items': [{'food_item': pasta.id, 'quantity': 1}]}, format='json')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert recommendation_cache.get(customer.id) is None
+    assert recommendation_cache.get(customer.id + 1) == [pasta.id]
+
+
+@pytest.mark.django_db
+def test_publishing_a_bundle_orphans_entries(customer):
+    recommendation_cache.set(customer.id, [1, 2])
+    # As an offline job in another process would
+    publish_bundle({'example.ids': np.arange(2)})
+    assert recommendation_cache.get(customer.id) is None
+
+
+@pytest.mark.django_db
+def test_cache_stats_endpoint_requires_admin(client, customer):
+    client.force_authenticate(user=customer)
+    assert client.get('/api/recommendations/cache-stats/').status_code == status.HTTP_403_FORBIDDEN
+
+    admin = get_user_model().objects.create_user(username="admin", password="password123", role="admin")
+    client.force_authenticate(user=admin)
+    response = client.get('/api/recommendations/cache-stats/')
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data) == {'hits', 'misses', 'hit_rate'}
+
+
+@pytest.mark.django_db
+def test_recommendations_keep_ranked_order(client, customer, menu):
+    pizza, pasta = menu
+    salad = FoodItem.objects.create(name="Salad", description="Green salad", price=6.99, category="Healthy")
+    recommendation_cache.set(customer.id, [salad.id, pasta.id])
+
+    client.force_authenticate(user=customer)
+    response = client.get('/api/recommendations/')
+    assert [item['id'] for item in response.data] == [salad.id, pasta.id]
+
+
+@pytest.mark.django_db
+def test_strategies_query_param(client, customer, menu):
+    pizza, pasta = menu
+    client.force_authenticate(user=customer)
+
+    response = client.get('/api/recommendations/?strategies=content')
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Server-Timing'].startswith('snapshot;dur=')
+    assert 'user_cf' not in response['Server-Timing']
+
+    response = client.get('/api/recommendations/?strategies=content,bogus')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
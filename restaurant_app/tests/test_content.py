@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from restaurant_app.models import FoodItem
+from restaurant_app.content import get_content_model
+
+
+@pytest.fixture
+def food_items():
+    return [
+        FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99, category="Italian"),
+        FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99, category="Italian"),
+        FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99, category="American"),
+    ]
+
+
+@pytest.mark.django_db
+def test_content_model_is_reused_until_catalog_changes(food_items, django_assert_num_queries, django_capture_on_commit_callbacks):
+    model = get_content_model(FoodItem)
+    with django_assert_num_queries(0):
+        assert get_content_model(FoodItem) is model
+
+    with django_capture_on_commit_callbacks(execute=True):
+        FoodItem.objects.create(name="Taco", description="Corn taco", price=4.99, category="Mexican")
+
+    refitted = get_content_model(FoodItem)
+    assert refitted is not model
+    assert refitted.version > model.version
+    assert len(refitted.item_ids) == 4
+
+
+@pytest.mark.django_db
+def test_category_rows_match_a_fresh_transform(food_items):
+    model = get_content_model(FoodItem)
+    rows = model.rows_in_categories(["Italian"])
+
+    expected = model.vectorizer.transform(model.food_data.iloc[rows]['content'])
+    assert np.allclose(model.matrix[rows].toarray(), expected.toarray())
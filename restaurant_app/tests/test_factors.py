@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from scipy import sparse
+from restaurant_app.artifacts import read_current_bundle
+from restaurant_app.factors import LatentFactorModel, get_latent_factors
+from restaurant_app.interactions import InteractionMatrix
+from restaurant_app.models import FoodItem, OrderItem, Order
+from restaurant_app.recommender import RestaurantRecommender
+
+
+def test_embeddings_are_float32_and_rank_items_of_similar_users():
+    # Users 0-2 share a taste for items 0-2, users 3-4 for items 3-4
+    matrix = sparse.csr_matrix(np.array([
+        [3, 2, 0, 0, 0],
+        [2, 3, 1, 0, 0],
+        [1, 2, 3, 0, 0],
+        [0, 0, 0, 2, 3],
+        [0, 0, 0, 3, 2],
+    ], dtype=np.float32))
+    model = LatentFactorModel.train(InteractionMatrix([10, 11, 12, 13, 14], [1, 2, 3, 4, 5], matrix), n_factors=2)
+
+    assert model.user_factors.dtype == np.float32
+    assert model.item_factors.shape == (5, 2)
+
+    item_ids, scores = model.recommend(10, n=1, mask=~np.isin(model.item_ids, [1, 2]))
+    assert item_ids.tolist() == [3]
+    assert len(model.recommend(99)[0]) == 0
+
+
+def test_users_are_found_whatever_the_row_order():
+    model = LatentFactorModel([30, 10, 20], [1, 2], [[3, 0], [1, 0], [2, 0]], [[1, 0], [0, 1]])
+
+    assert model.user_ids.tolist() == [10, 20, 30]
+    assert model.scores(30).tolist() == [3, 0]
+    assert model.scores(10).tolist() == [1, 0]
+    assert model.scores(15) is None
+    assert model.scores(99) is None
+    assert LatentFactorModel.empty().scores(10) is None
+
+
+@pytest.mark.django_db
+def test_command_trains_model_used_by_latent_strategy():
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+
+    for customer, items in ((alice, [pizza]), (bob, [pizza, pasta])):
+        order = Order.objects.create(customer=customer, total_price=0)
+        for food_item in items:
+            OrderItem.objects.create(order=order, food_item=food_item, quantity=1, price=food_item.price)
+
+    # The model is only trained offline
+    recommender = RestaurantRecommender(alice, Order, OrderItem, FoodItem, strategies=['latent'])
+    assert recommender.get_recommendations() == []
+
+    call_command('train_latent_factors', factors=2)
+    assert 'latent.user_factors' in read_current_bundle()
+    assert get_latent_factors(OrderItem).n_factors == 2
+
+    recommender = RestaurantRecommender(alice, Order, OrderItem, FoodItem, strategies=['latent'])
+    assert recommender.get_recommendations() == [pasta.id]
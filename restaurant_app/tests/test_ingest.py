@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from restaurant_app.caches import recommendation_cache
+from restaurant_app.ingest import ingest_orders
+from restaurant_app.models import FoodItem, FoodItemStats, ItemPairCount, Order, OrderItem, UserProfile
+from restaurant_app.trending import get_trending_counter
+
+
+@pytest.fixture
+def customers():
+    User = get_user_model()
+    return [
+        User.objects.create_user(username="alice", email="alice@example.com", password="password123"),
+        User.objects.create_user(username="bob", email="bob@example.com", password="password123"),
+    ]
+
+
+@pytest.fixture
+def menu():
+    return [
+        FoodItem.objects.create(name="Burger", description="Beef burger", price=8, category="American"),
+        FoodItem.objects.create(name="Fries", description="Salted fries", price=3, category="Sides"),
+        FoodItem.objects.create(name="Soup", description="Tomato soup", price=5, is_available=False),
+    ]
+
+
+@pytest.mark.django_db
+def test_chunks_report_each_row_and_update_counters_once(customers, menu, django_capture_on_commit_callbacks):
+    alice, bob = customers
+    burger, fries, soup = menu
+    recommendation_cache.set(alice.id, [fries.id])
+    rows = [
+        {'customer': alice.id, 'items': [{'food_item': burger.id, 'quantity': 1}, {'food_item': fries.id, 'quantity': 2}]},
+        {'customer': bob.id, 'items': [{'food_item': soup.id, 'quantity': 1}]},
+        {'customer': 999999, 'items': [{'food_item': burger.id, 'quantity': 1}]},
+        {'customer': bob.id, 'items': []},
+        {'customer': bob.id, 'items': [{'food_item': burger.id, 'quantity': 3}, {'food_item': fries.id, 'quantity': 1}],
+         'status': 'completed'},
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        results = ingest_orders(rows, chunk_size=2)
+
+    assert [result['row'] for result in results] == [0, 1, 2, 3, 4]
+    assert [('id' in result) for result in results] == [True, False, False, False, True]
+    assert set(results[1]['errors']['items'][0]) == {'food_item'}
+    assert set(results[2]['errors']) == {'customer'}
+    assert set(results[3]['errors']) == {'items'}
+
+    order = Order.objects.get(pk=results[4]['id'])
+    assert (order.customer, order.total_price, order.status) == (bob, 27, 'completed')
+    assert OrderItem.objects.count() == 4
+    assert FoodItemStats.objects.get(food_item=burger).total_quantity == 4
+    assert FoodItemStats.objects.get(food_item=fries).basket_count == 2
+    assert ItemPairCount.objects.get(food_item=burger, other=fries).count == 2
+    assert UserProfile.objects.get(user=bob).category_counts == {'American': 3, 'Sides': 1}
+    assert get_trending_counter().top(1) == [(burger.id, 4)]
+    assert recommendation_cache.get(alice.id) is None
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_streams_ndjson(customers, menu):
+    alice, bob = customers
+    burger, fries, _ = menu
+    admin = get_user_model().objects.create_user(username="admin", password="password123", role="admin")
+    body = "\n".join([
+        json.dumps({'customer': alice.id, 'items': [{'food_item': burger.id, 'quantity': 1}]}),
+        "{not json",
+        "",
+        json.dumps({'customer': bob.id, 'items': [{'food_item': fries.id, 'quantity': 2}]}),
+    ])
+
+    client = APIClient()
+    client.force_authenticate(user=alice)
+    response = client.post('/api/orders/bulk/', body, content_type='application/x-ndjson')
+    assert response.status_code == 403
+
+    client.force_authenticate(user=admin)
+    response = client.post('/api/orders/bulk/', body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert (response.data['created'], response.data['failed']) == (2, 1)
+    assert 'JSON parse error' in response.data['results'][1]['errors']['non_field_errors'][0]
+    assert Order.objects.filter(customer=bob).get().total_price == 6
+
+    response = client.post('/api/orders/bulk/', [
+        {'customer': alice.id, 'items': [{'food_item': fries.id, 'quantity': 1}]},
+    ], format='json')
+    assert response.data['created'] == 1
+    assert client.post('/api/orders/bulk/', {'customer': alice.id}, format='json').status_code == 400
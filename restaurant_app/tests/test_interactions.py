@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from restaurant_app.models import FoodItem, OrderItem, Order
+from restaurant_app.interactions import InteractionMatrix, get_interaction_matrix
+
+
+@pytest.fixture
+def orders():
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    burger = FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99)
+
+    order1 = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order1, food_item=pizza, quantity=2, price=pizza.price)
+    order2 = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order2, food_item=pizza, quantity=1, price=pizza.price)
+    order3 = Order.objects.create(customer=bob, total_price=0)
+    OrderItem.objects.create(order=order3, food_item=burger, quantity=4, price=burger.price)
+
+    return alice, bob, pizza, burger
+
+
+@pytest.mark.django_db
+def test_matrix_sums_quantities_per_user_and_item(orders):
+    alice, bob, pizza, burger = orders
+    interactions = get_interaction_matrix(OrderItem)
+
+    assert interactions.shape == (2, 2)
+    row = interactions.user_index[alice.id]
+    col = interactions.item_index[pizza.id]
+    assert interactions.matrix[row, col] == 3
+    assert interactions.row_norms[interactions.user_index[bob.id]] == pytest.approx(4)
+
+
+@pytest.mark.django_db
+def test_matrix_is_built_once(orders, django_assert_num_queries):
+    first = get_interaction_matrix(OrderItem)
+    with django_assert_num_queries(0):
+        assert get_interaction_matrix(OrderItem) is first
+
+
+@pytest.mark.django_db
+def test_nearest_users_excludes_self(orders):
+    alice, bob, pizza, burger = orders
+    interactions = get_interaction_matrix(OrderItem)
+
+    row = interactions.user_index[alice.id]
+    rows, similarities = interactions.nearest_users(row)
+    assert rows.tolist() == [interactions.user_index[bob.id]]
+    assert similarities.tolist() == [0]
+
+
+@pytest.mark.django_db
+def test_new_order_patches_only_the_customer_row(orders, django_capture_on_commit_callbacks):
+    alice, bob, pizza, burger = orders
+    interactions = get_interaction_matrix(OrderItem)
+
+    User = get_user_model()
+    carol = User.objects.create_user(username="carol", email="carol@example.com", password="password123")
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        order = Order.objects.create(customer=carol, total_price=0)
+        OrderItem.objects.create(order=order, food_item=pasta, quantity=2, price=pasta.price)
+        OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=pizza.price)
+
+    assert get_interaction_matrix(OrderItem) is interactions
+    assert interactions.shape == (3, 3)
+    row = interactions.user_index[carol.id]
+    assert interactions.matrix[row, interactions.item_index[pasta.id]] == 2
+    assert interactions.row_norms[row] == pytest.approx(5 ** 0.5)
+    assert interactions.nearest_users(row)[0][0] == interactions.user_index[alice.id]
+
+
+@pytest.mark.django_db
+def test_deleted_order_clears_the_customer_row(orders, django_capture_on_commit_callbacks):
+    alice, bob, pizza, burger = orders
+    interactions = get_interaction_matrix(OrderItem)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Order.objects.filter(customer=bob).delete()
+
+    row = interactions.user_index[bob.id]
+    assert len(interactions.user_row(row)[0]) == 0
+    assert interactions.row_norms[row] == 0
+    assert interactions.matrix[row].nnz == 0
+
+
+@pytest.mark.django_db
+def test_matrix_is_read_in_chunks_and_limited_to_the_window(orders):
+    alice, bob, pizza, burger = orders
+    old_order = Order.objects.create(customer=bob, total_price=0)
+    OrderItem.objects.create(order=old_order, food_item=pizza, quantity=5, price=pizza.price)
+    Order.objects.filter(id=old_order.id).update(created_at=timezone.now() - timedelta(days=400))
+
+    full = InteractionMatrix.from_order_items(OrderItem, chunk_size=1)
+    assert full.matrix[full.user_index[bob.id], full.item_index[pizza.id]] == 5
+
+    recent = InteractionMatrix.from_order_items(OrderItem, window_days=365, chunk_size=2)
+    columns, _ = recent.user_row(recent.user_index[bob.id])
+    assert pizza.id not in recent.item_ids[columns]
+
+    # Alice's most recent order only
+    last_orders = InteractionMatrix.from_order_items(OrderItem, max_orders=1)
+    assert last_orders.matrix[last_orders.user_index[alice.id], last_orders.item_index[pizza.id]] == 1
+
+
+@pytest.mark.django_db
+def test_orders_leaving_the_window_are_aged_out(orders, settings):
+    alice, bob, pizza, burger = orders
+    settings.RECOMMENDER = {'INTERACTION_WINDOW_DAYS': 365}
+    interactions = get_interaction_matrix(OrderItem)
+    row = interactions.user_index[bob.id]
+    assert interactions.matrix[row, interactions.item_index[burger.id]] == 4
+
+    # Bob's order was placed 400 days ago and the matrix built long since
+    Order.objects.filter(customer=bob).update(created_at=timezone.now() - timedelta(days=400))
+    interactions.window_start = timezone.now() - timedelta(days=500)
+
+    assert get_interaction_matrix(OrderItem) is interactions
+    assert interactions.matrix[row].nnz == 0
+    assert interactions.matrix[interactions.user_index[alice.id], interactions.item_index[pizza.id]] == 3
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from restaurant_app.baskets import rebuild_item_pairs
+from restaurant_app.models import FoodItem, FoodItemStats, ItemPairCount, OrderItem, OrderStats, UserProfile
+from restaurant_app.popularity import rebuild_food_item_stats
+from restaurant_app.profiles import rebuild_user_profiles
+
+BEFORE_COUNTERS = [('restaurant_app', '0002_precomputedrecommendation')]
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counters_and_profiles_are_built_when_migrating_existing_orders():
+    executor = MigrationExecutor(connection)
+    latest = executor.loader.graph.leaf_nodes('restaurant_app')
+    apps = migrate(BEFORE_COUNTERS)
+    try:
+        User = apps.get_model('restaurant_app', 'User')
+        HistoricalFoodItem = apps.get_model('restaurant_app', 'FoodItem')
+        Order = apps.get_model('restaurant_app', 'Order')
+        HistoricalOrderItem = apps.get_model('restaurant_app', 'OrderItem')
+
+        alice = User.objects.create(username="alice")
+        old = HistoricalFoodItem.objects.create(name="Old", description="", price=1, category="Old")
+        new = HistoricalFoodItem.objects.create(name="New", description="", price=1, category="New")
+        for food_items, created_at in (
+            ([old], datetime(2024, 1, 1, tzinfo=timezone.utc)),
+            ([old, new], datetime(2026, 1, 1, tzinfo=timezone.utc)),
+        ):
+            order = Order.objects.create(customer=alice, total_price=1)
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+            for food_item in food_items:
+                HistoricalOrderItem.objects.create(order=order, food_item=food_item, quantity=2, price=1)
+    finally:
+        migrate(latest)
+
+    migrated_stats = dict(FoodItemStats.objects.values_list('food_item_id', 'log_decayed_quantity'))
+    migrated_affinity = UserProfile.objects.get(user_id=alice.pk).category_affinity
+    migrated_baskets = dict(FoodItemStats.objects.values_list('food_item_id', 'basket_count'))
+    migrated_pairs = set(ItemPairCount.objects.values_list('food_item_id', 'other_id', 'count'))
+    assert OrderStats.objects.get(pk=1).basket_count == 2
+    rebuild_food_item_stats(FoodItem, OrderItem, FoodItemStats)
+    rebuild_user_profiles(OrderItem, UserProfile)
+    rebuild_item_pairs(OrderItem, ItemPairCount, FoodItemStats, OrderStats)
+
+    assert migrated_stats == pytest.approx(dict(FoodItemStats.objects.values_list('food_item_id', 'log_decayed_quantity')))
+    assert set(migrated_affinity) == {'Old', 'New'}
+    assert migrated_affinity == pytest.approx(UserProfile.objects.get(user_id=alice.pk).category_affinity)
+    assert migrated_baskets == {old.pk: 2, new.pk: 1}
+    assert migrated_baskets == dict(FoodItemStats.objects.values_list('food_item_id', 'basket_count'))
+    assert migrated_pairs == set(ItemPairCount.objects.values_list('food_item_id', 'other_id', 'count'))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from restaurant_app.models import FoodItem, OrderItem, Order
+from restaurant_app.artifacts import read_current_bundle
+from restaurant_app.neighbors import ItemNeighborTable, get_item_neighbors
+
+
+@pytest.fixture
+def catalog():
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+
+    margherita = FoodItem.objects.create(name="Margherita", description="Tomato cheese pizza", price=9.99, category="Italian")
+    pepperoni = FoodItem.objects.create(name="Pepperoni", description="Spicy cheese pizza", price=11.99, category="Italian")
+    burger = FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99, category="American")
+    fries = FoodItem.objects.create(name="Fries", description="Salted potato sticks", price=3.99, category="Sides")
+
+    for customer in (alice, bob):
+        order = Order.objects.create(customer=customer, total_price=0)
+        OrderItem.objects.create(order=order, food_item=burger, quantity=1, price=burger.price)
+        OrderItem.objects.create(order=order, food_item=fries, quantity=1, price=fries.price)
+
+    return margherita, pepperoni, burger, fries
+
+
+@pytest.mark.django_db
+def test_neighbors_blend_text_and_co_purchase(catalog):
+    margherita, pepperoni, burger, fries = catalog
+    table = ItemNeighborTable.build(FoodItem, OrderItem, k=2)
+
+    assert table.neighbor_ids.dtype == np.int32
+    assert table.scores.dtype == np.float32
+
+    neighbor_ids, scores = table.neighbors(margherita.id)
+    assert neighbor_ids[0] == pepperoni.id
+    assert margherita.id not in neighbor_ids
+
+    neighbor_ids, scores = table.neighbors(burger.id)
+    assert neighbor_ids[0] == fries.id
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+@pytest.mark.django_db
+def test_unknown_item_has_no_neighbors(catalog):
+    neighbor_ids, scores = ItemNeighborTable.build(FoodItem, OrderItem).neighbors(10 ** 6)
+    assert len(neighbor_ids) == 0
+
+
+@pytest.mark.django_db
+def test_command_saves_table_for_later_lookups(catalog):
+    margherita, pepperoni, burger, fries = catalog
+    call_command('build_item_neighbors', k=1)
+
+    FoodItem.objects.create(name="Calzone", description="Folded cheese pizza", price=12.99, category="Italian")
+    table = get_item_neighbors(FoodItem, OrderItem)
+
+    assert table.k == 1
+    assert table.neighbors(margherita.id)[0].tolist() == [pepperoni.id]
+    assert ItemNeighborTable.from_bundle(read_current_bundle()).neighbor_ids.tolist() == table.neighbor_ids.tolist()
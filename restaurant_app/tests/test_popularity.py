@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from restaurant_app.models import FoodItemStats
+from restaurant_app.popularity import record_sales, top_food_item_ids, top_food_items, reset_top_lists
+
+
+@pytest.mark.django_db
+def test_new_food_items_get_a_stats_row(menu):
+    assert FoodItemStats.objects.filter(total_quantity=0).count() == len(menu)
+
+
+@pytest.mark.django_db
+def test_order_items_update_counters(customer, menu, place_order):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    place_order(customer, [(pizza, 2), (burger, 1)])
+    place_order(customer, [(pizza, 1)])
+
+    assert FoodItemStats.objects.get(food_item=pizza).total_quantity == 3
+    assert top_food_item_ids(sold_only=True) == [pizza.id, burger.id]
+    assert top_food_item_ids(category="Italian") == [pizza.id, pasta.id]
+
+
+@pytest.mark.django_db
+def test_decayed_counter_prefers_recent_sales(menu):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    record_sales({pizza.id: 4}, timestamp=timezone.now() - timedelta(days=60))
+    record_sales({burger.id: 1})
+
+    assert top_food_item_ids(n=1) == [pizza.id]
+    assert top_food_item_ids(n=1, decayed=True) == [burger.id]
+
+
+@pytest.mark.django_db
+def test_top_lists_are_cached_until_reset(customer, menu, place_order, django_assert_num_queries):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    top_food_item_ids()
+    place_order(customer, [(burger, 5)])
+
+    with django_assert_num_queries(0):
+        assert top_food_item_ids()[0] != burger.id
+    reset_top_lists()
+    assert top_food_item_ids()[0] == burger.id
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_counters(customer, menu, place_order):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    place_order(customer, [(pizza, 2), (pasta, 1)])
+    incremental = dict(FoodItemStats.objects.values_list('food_item_id', 'total_quantity'))
+
+    FoodItemStats.objects.all().delete()
+    call_command('rebuild_food_item_stats')
+
+    assert dict(FoodItemStats.objects.values_list('food_item_id', 'total_quantity')) == incremental
+
+
+@pytest.mark.django_db
+def test_decayed_counter_survives_far_future_sales(menu, settings):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    settings.RECOMMENDER = {**settings.RECOMMENDER, 'POPULARITY_HALF_LIFE_DAYS': 1}
+    # 2 ** (days / half-life) would overflow a float long before this
+    far_future = timezone.now() + timedelta(days=20 * 365)
+    record_sales({pizza.id: 1}, timestamp=far_future)
+    record_sales({pizza.id: 1}, timestamp=far_future)
+    record_sales({burger.id: 1}, timestamp=far_future - timedelta(days=1))
+
+    assert top_food_items(n=2, decayed=True) == [(pizza.id, 1.0), (burger.id, pytest.approx(0.25))]
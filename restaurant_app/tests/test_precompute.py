@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from scipy import sparse
+from restaurant_app.caches import recommendation_cache
+from restaurant_app.catalog import bump_catalog_version, catalog_fingerprint
+from restaurant_app.models import FoodItem, OrderItem, Order, PrecomputedRecommendation
+from restaurant_app.recommender import RestaurantRecommender
+from restaurant_app.precompute import BlockRecommender, iter_recommendation_blocks
+
+
+@pytest.fixture
+def matrix():
+    # users x items; users 0 and 1 share item 0, user 2 only overlaps user 1
+    return sparse.csr_matrix(np.array([
+        [2, 0, 0, 0],
+        [1, 3, 0, 0],
+        [0, 1, 4, 0],
+    ], dtype=np.float32))
+
+
+def test_block_recommender_scores_items_of_similar_users(matrix):
+    recommender = BlockRecommender(matrix, n_neighbors=1, n_recommendations=2)
+    columns, scores = recommender.recommend([0, 2])
+
+    assert columns[0].tolist() == [1, 2]
+    assert scores[0][0] > scores[0][1]
+    assert columns[1][0] == 0
+    assert 2 not in columns[1]
+
+
+def test_unavailable_columns_are_never_recommended(matrix):
+    recommender = BlockRecommender(matrix, n_neighbors=1, n_recommendations=2)
+    columns, _ = recommender.recommend([0], available=np.array([True, False, True, True]))
+
+    assert 1 not in columns[0]
+
+
+def test_blocks_are_identical_across_worker_counts(matrix):
+    serial = list(iter_recommendation_blocks(matrix, [0, 1, 2], block_size=2, workers=1))
+    parallel = list(iter_recommendation_blocks(matrix, [0, 1, 2], block_size=2, workers=2))
+
+    assert len(serial) == 2
+    for (rows, columns, _), (parallel_rows, parallel_columns, _) in zip(serial, parallel):
+        assert rows.tolist() == parallel_rows.tolist()
+        assert columns.tolist() == parallel_columns.tolist()
+
+
+@pytest.mark.django_db
+def test_command_stores_and_view_serves_precomputed_rows(django_capture_on_commit_callbacks):
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+
+    for customer, items in ((alice, [pizza]), (bob, [pizza, pasta])):
+        order = Order.objects.create(customer=customer, total_price=0)
+        for food_item in items:
+            OrderItem.objects.create(order=order, food_item=food_item, quantity=1, price=food_item.price)
+
+    call_command('precompute_recommendations', workers=1)
+    call_command('precompute_recommendations', users=[alice.id], workers=1)
+
+    assert PrecomputedRecommendation.objects.count() == 2
+    assert PrecomputedRecommendation.objects.get(user=alice).food_item_ids == [pasta.id]
+
+    client = APIClient()
+    client.force_authenticate(user=alice)
+    response = client.get('/api/recommendations/')
+    assert [item['id'] for item in response.data] == [pasta.id]
+    assert 'Server-Timing' not in response
+
+    # The server's version counter moving, or starting over after a
+    # restart, without a catalog change leaves the rows valid
+    bump_catalog_version()
+    response = client.get('/api/recommendations/')
+    assert [item['id'] for item in response.data] == [pasta.id]
+    assert 'Server-Timing' not in response
+
+    # Rows from an older catalog are recomputed live
+    with django_capture_on_commit_callbacks(execute=True):
+        soup = FoodItem.objects.create(name="Soup", description="Tomato soup", price=5.99)
+    PrecomputedRecommendation.objects.filter(user=alice).update(food_item_ids=[pizza.id, pasta.id])
+    recommendation_cache.invalidate(alice.id)
+    response = client.get('/api/recommendations/')
+    live = RestaurantRecommender(alice, Order, OrderItem, FoodItem).get_recommendations()
+    assert soup.id in live
+    assert [item['id'] for item in response.data] == live
+
+
+@pytest.mark.django_db
+def test_command_skips_unavailable_items():
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99, is_available=False)
+
+    for customer, items in ((alice, [pizza]), (bob, [pizza, pasta])):
+        order = Order.objects.create(customer=customer, total_price=0)
+        for food_item in items:
+            OrderItem.objects.create(order=order, food_item=food_item, quantity=1, price=food_item.price)
+
+    call_command('precompute_recommendations', users=[alice.id], workers=1)
+    assert PrecomputedRecommendation.objects.get(user=alice).food_item_ids == []
+
+
+@pytest.mark.django_db
+def test_view_drops_ordered_and_unavailable_items_from_stored_rows():
+    alice = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+    soup = FoodItem.objects.create(name="Soup", description="Tomato soup", price=5.99, is_available=False)
+    order = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=pizza.price)
+
+    # Stored before Alice's order and the soup going off the menu
+    PrecomputedRecommendation.objects.create(
+        user=alice, food_item_ids=[pizza.id, soup.id, pasta.id], catalog_fingerprint=catalog_fingerprint(FoodItem)
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=alice)
+    for _ in range(2):
+        # Cache miss, then cache hit
+        response = client.get('/api/recommendations/')
+        assert [item['id'] for item in response.data] == [pasta.id]
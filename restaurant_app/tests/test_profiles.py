@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from restaurant_app.models import OrderItem, UserProfile
+from restaurant_app.profiles import category_affinity, rebuild_user_profiles, record_customer_purchases, record_purchases
+
+
+@pytest.mark.django_db
+def test_profile_is_updated_as_orders_are_placed(customer, menu, place_order):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    place_order(customer, [(pizza, 2), (burger, 1)])
+    order = place_order(customer, [(pasta, 1)])
+
+    profile = UserProfile.objects.get(user=customer)
+    assert profile.category_counts == {'Italian': 3, 'American': 1}
+    assert profile.last_order_at == order.created_at
+    affinity = category_affinity(customer.id)
+    assert affinity['Italian'] > affinity['American']
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_profiles(customer, menu, place_order, django_capture_on_commit_callbacks):
+    pizza, pasta, burger = menu.pizza, menu.pasta, menu.burger
+    place_order(customer, [(pizza, 2), (burger, 1)])
+    incremental = UserProfile.objects.get(user=customer)
+
+    rebuild_user_profiles(OrderItem, UserProfile)
+    rebuilt = UserProfile.objects.get(user=customer)
+    assert rebuilt.category_counts == incremental.category_counts
+    assert rebuilt.category_affinity == pytest.approx(incremental.category_affinity)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderItem.objects.filter(food_item=burger).delete()
+    assert UserProfile.objects.get(user=customer).category_counts == {'Italian': 2}
+
+
+@pytest.mark.django_db
+def test_unknown_user_has_no_affinity(customer, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert category_affinity(customer.id) == {}
+
+
+@pytest.mark.django_db
+def test_customer_purchases_run_a_fixed_number_of_queries(customer, django_assert_num_queries):
+    others = [
+        get_user_model().objects.create_user(username=f"user{i}", password="password123") for i in range(3)
+    ]
+    now = timezone.now()
+    record_purchases(customer.id, {'Italian': 1}, now)
+    purchases = {user.id: ({'Italian': 2, 'Sides': 1}, now) for user in [customer, *others]}
+
+    with django_assert_num_queries(5):
+        record_customer_purchases(purchases)
+
+    assert UserProfile.objects.get(user=customer).category_counts == {'Italian': 3, 'Sides': 1}
+    assert UserProfile.objects.filter(user__in=others, category_counts={'Italian': 2, 'Sides': 1}).count() == 3
@@ -0,0 +1,27 @@
+import numpy as np
+from restaurant_app.ranking import HybridRanker, top_k_indices
+
+
+def test_top_k_indices_orders_best_first_and_drops_masked():
+    scores = np.array([0.5, -np.inf, 2.0, 0.5, 1.0], dtype=np.float32)
+    assert top_k_indices(scores, 3).tolist() == [2, 4, 0]
+    assert top_k_indices(scores, 10).tolist() == [2, 4, 0, 3]
+
+
+def test_ranker_fuses_weighted_scores():
+    ranker = HybridRanker([10, 20, 30, 40], weights={'a': 1.0, 'b': 0.5})
+    ranked = ranker.rank({
+        'a': (np.array([10, 20]), np.array([4.0, 2.0])),
+        'b': (np.array([20, 30]), np.array([1.0, 1.0])),
+    }, exclude=np.zeros(4, dtype=bool), n=10)
+
+    # 20: 0.5 + 0.5, 10: 1.0, 30: 0.5; 40 was never proposed
+    assert ranked == [10, 20, 30]
+
+
+def test_ranker_applies_exclusion_mask_and_ignores_unknown_ids():
+    ranker = HybridRanker([10, 20, 30], weights={'a': 1.0})
+    exclude = ranker.mask([10]) | ~ranker.mask([10, 20])
+
+    ranked = ranker.rank({'a': (np.array([10, 20, 30, 99]), np.array([3.0, 2.0, 1.0, 9.0]))}, exclude, n=5)
+    assert ranked == [20]
@@ -72,6 +72,8 @@ def test_collaborative_filtering(recommender):
 # Test for content-based filtering
 @pytest.mark.django_db
 def test_content_based_filtering(recommender):
+    # Items the user already ordered are never proposed, so add another
+    FoodItem.objects.create(name="Calzone", description="Delicious folded pizza", price=12.99)
     recommendations = recommender.content_based_filtering()
     assert isinstance(recommendations, list)
     assert len(recommendations) > 0
@@ -79,6 +81,80 @@ def test_content_based_filtering(recommender):
 # Test for popularity-based recommendations
 @pytest.mark.django_db
 def test_popularity_based(recommender):
+    # Items the user already ordered are never proposed, so sell another
+    other = get_user_model().objects.create_user(username="other", email="other@example.com", password="password123")
+    burger = FoodItem.objects.create(name="Burger", description="Juicy beef burger", price=8.99)
+    order = Order.objects.create(customer=other, total_price=burger.price, status='completed')
+    OrderItem.objects.create(order=order, food_item=burger, quantity=1, price=burger.price)
     recommendations = recommender.popularity_based()
     assert isinstance(recommendations, list)
     assert len(recommendations) > 0
+
+
+@pytest.mark.django_db
+def test_get_recommendations_reads_history_once(recommender, food_item, django_assert_num_queries):
+    other = FoodItem.objects.create(name="Burger", description="Juicy beef burger", price=8.99)
+    unavailable = FoodItem.objects.create(name="Soup", description="Seasonal soup", price=4.99, is_available=False)
+    # Warm the shared models so only the per-request snapshot touches the database
+    recommender.get_recommendations()
+
+    fresh = RestaurantRecommender(user=recommender.user, Order=Order, OrderItem=OrderItem, FoodItem=FoodItem)
+    # Ordered item ids, the taste profile row and the basket partners of the
+    # ordered items; availability comes from the cached catalog index
+    with django_assert_num_queries(3):
+        recommendations = fresh.get_recommendations()
+
+    assert food_item.id not in recommendations
+    assert unavailable.id not in recommendations
+    assert other.id in recommendations
+    assert set(fresh.timings) == {'snapshot', 'user_cf', 'item_cf', 'basket', 'content', 'popularity', 'ranking'}
+
+
+@pytest.mark.django_db
+def test_strategies_are_selected_from_the_registry(recommender, user):
+    popular_only = RestaurantRecommender(user=user, Order=Order, OrderItem=OrderItem, FoodItem=FoodItem, strategies=['popularity'])
+    popular_only.get_recommendations()
+    assert set(popular_only.timings) == {'snapshot', 'popularity', 'ranking'}
+
+    with pytest.raises(ValueError):
+        RestaurantRecommender(user=user, Order=Order, OrderItem=OrderItem, FoodItem=FoodItem, strategies=['nope'])
+
+
+@pytest.mark.django_db
+def test_every_strategy_skips_unavailable_items(recommender, django_capture_on_commit_callbacks):
+    other = get_user_model().objects.create_user(username="other", email="other@example.com", password="password123")
+    burger = FoodItem.objects.create(name="Burger", description="Delicious beef burger", price=8.99)
+    order = Order.objects.create(customer=other, total_price=burger.price, status='completed')
+    OrderItem.objects.create(order=order, food_item=burger, quantity=1, price=burger.price)
+    assert burger.id in recommender.popularity_based()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        burger.is_available = False
+        burger.save()
+
+    fresh = RestaurantRecommender(user=recommender.user, Order=Order, OrderItem=OrderItem, FoodItem=FoodItem)
+    for name in ('user_cf', 'item_cf', 'basket', 'content', 'popularity', 'latent'):
+        ids, _ = fresh.score(name)
+        assert burger.id not in ids.tolist()
+
+
+@pytest.mark.django_db
+def test_top_lists_are_not_emptied_by_masking(user):
+    other = get_user_model().objects.create_user(username="other", email="other@example.com", password="password123")
+    items = [
+        FoodItem.objects.create(name=f"Dish {i}", description="House dish", price=5, is_available=i not in (3, 4))
+        for i in range(15)
+    ]
+    # Best sellers first; the user ordered the top three together
+    order = Order.objects.create(customer=other, total_price=0, status='completed')
+    for i, item in enumerate(items):
+        OrderItem.objects.create(order=order, food_item=item, quantity=20 - i, price=item.price)
+    order = Order.objects.create(customer=user, total_price=0, status='completed')
+    for item in items[:3]:
+        OrderItem.objects.create(order=order, food_item=item, quantity=1, price=item.price)
+
+    recommender = RestaurantRecommender(user=user, Order=Order, OrderItem=OrderItem, FoodItem=FoodItem)
+    assert recommender.popularity_based() == [item.id for item in items[5:15]]
+
+    ids, _ = recommender.score('basket')
+    assert sorted(ids.tolist()) == sorted(item.id for item in items[5:])
@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from restaurant_app.models import FoodItem
+from restaurant_app.search import SearchIndex, get_search_index
+
+
+def test_matches_every_term_and_ranks_by_tf_idf():
+    index = SearchIndex()
+    index.add(1, "Margherita pizza with tomato and basil")
+    index.add(2, "Pepperoni pizza pizza")
+    index.add(3, "Tomato soup")
+
+    assert [item_id for item_id, _ in index.search("pizza ")] == [2, 1]
+    assert [item_id for item_id, _ in index.search("tomato pizza ")] == [1]
+    assert index.search("the and ") == []
+    assert index.search("sushi ") == []
+
+
+def test_last_word_matches_as_a_prefix():
+    index = SearchIndex()
+    index.add(1, "Pepperoni pizza")
+    index.add(2, "Pita bread")
+    index.add(3, "Pizzeria special pizza")
+
+    assert {item_id for item_id, _ in index.search("pi")} == {1, 2, 3}
+    assert {item_id for item_id, _ in index.search("pizz")} == {1, 3}
+    assert [item_id for item_id, _ in index.search("pepperoni piz")] == [1]
+    # A finished word no longer matches as a prefix
+    assert index.search("piz ") == []
+    # A trailing word too short to be a token doesn't narrow the search yet
+    assert {item_id for item_id, _ in index.search("pizza m")} == {1, 3}
+    assert index.search("piz m") == []
+    assert index.search("m") == []
+
+
+def test_reindexing_and_removal_update_postings():
+    index = SearchIndex()
+    index.add(1, "Beef burger")
+    index.add(2, "Veggie burger")
+    index.add(1, "Chicken wrap")
+    index.remove(2)
+
+    assert index.search("burger ") == []
+    assert index.search("chicken ") == [(1, pytest.approx(index.idf("chicken") / 2 ** 0.5))]
+    assert len(index) == 1
+
+
+@pytest.mark.django_db
+def test_search_endpoint_follows_catalog_changes(django_capture_on_commit_callbacks):
+    user = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    burger = FoodItem.objects.create(name="Burger", description="Beef burger", price=8.99, category="American")
+    FoodItem.objects.create(name="Salad", description="Green salad", price=6.99, category="Healthy")
+
+    response = client.get('/api/food-items/search/', {'q': 'bur'})
+    assert [item['id'] for item in response.data] == [burger.id]
+    assert response.data[0]['score'] > 0
+    assert client.get('/api/food-items/search/').status_code == 400
+
+    index = get_search_index(FoodItem)
+    with django_capture_on_commit_callbacks(execute=True):
+        burger.name = "Cheeseburger"
+        burger.description = "Beef patty with cheese"
+        burger.save()
+        wrap = FoodItem.objects.create(name="Wrap", description="Chicken wrap", price=7.49, category="American")
+
+    assert get_search_index(FoodItem) is index
+    assert [item['id'] for item in client.get('/api/food-items/search/', {'q': 'chee'}).data] == [burger.id]
+    assert [item['id'] for item in client.get('/api/food-items/search/', {'q': 'american'}).data] == [burger.id, wrap.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        wrap.delete()
+    assert [item['id'] for item in client.get('/api/food-items/search/', {'q': 'american'}).data] == [burger.id]
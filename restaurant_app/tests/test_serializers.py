@@ -47,3 +47,64 @@ def test_food_item_serializer_create(food_item_data):
     assert serializer.is_valid()
     food_item = serializer.save()
     assert food_item.name == food_item_data["name"]
+
+
+@pytest.mark.django_db
+def test_order_serializer_creates_lines_in_bulk(django_assert_max_num_queries):
+    from restaurant_app.models import FoodItem, FoodItemStats, ItemPairCount, Order, UserProfile
+    from restaurant_app.serializers import OrderSerializer
+
+    customer = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10, category="Italian")
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12, category="Italian")
+    sides = [
+        FoodItem.objects.create(name=f"Side {i}", description="Side dish", price=1, category="Sides")
+        for i in range(18)
+    ]
+
+    serializer = OrderSerializer(data={'items': [
+        {'food_item': pizza.id, 'quantity': 2},
+        {'food_item': pasta.id, 'quantity': 1},
+        {'food_item': pizza.id, 'quantity': 1},
+    ] + [{'food_item': side.id, 'quantity': 1} for side in sides]})
+    assert serializer.is_valid(), serializer.errors
+    # A few statements per counter table, not per item or pair; only the
+    # batching of the 380 new pair rows depends on the database
+    with django_assert_max_num_queries(25) as captured:
+        order = serializer.save(customer=customer)
+    # One price lookup and one insert each for the order and its lines
+    statements = [query['sql'].split(' (')[0] for query in captured.captured_queries]
+    assert sum(sql.startswith('SELECT') and 'restaurant_app_fooditem"' in sql for sql in statements) == 1
+    assert statements.count('INSERT INTO "restaurant_app_order"') == 1
+    assert statements.count('INSERT INTO "restaurant_app_orderitem"') == 1
+
+    order = Order.objects.get(pk=order.pk)
+    assert order.total_price == 60
+    assert order.orderitem_set.count() == 21
+    assert FoodItemStats.objects.get(food_item=pizza).total_quantity == 3
+    assert FoodItemStats.objects.get(food_item=pizza).basket_count == 1
+    assert ItemPairCount.objects.count() == 20 * 19
+    assert ItemPairCount.objects.get(food_item=pizza, other=pasta).count == 1
+    assert UserProfile.objects.get(user=customer).category_counts == {'Italian': 4, 'Sides': 18}
+
+
+@pytest.mark.django_db
+def test_order_serializer_rejects_unavailable_items():
+    from restaurant_app.models import FoodItem, Order
+    from restaurant_app.serializers import OrderSerializer
+
+    customer = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10)
+    soup = FoodItem.objects.create(name="Soup", description="Tomato soup", price=5, is_available=False)
+
+    serializer = OrderSerializer(data={'items': [
+        {'food_item': pizza.id, 'quantity': 1},
+        {'food_item': soup.id, 'quantity': 1},
+        {'food_item': 999999, 'quantity': 1},
+    ]})
+    assert serializer.is_valid()
+    with pytest.raises(ValidationError) as excinfo:
+        serializer.save(customer=customer)
+
+    assert set(excinfo.value.detail['items']) == {1, 2}
+    assert not Order.objects.exists()
@@ -0,0 +1,34 @@
+import numpy as np
+from scipy import sparse
+from restaurant_app.interactions import normalize_rows
+from restaurant_app.similarity import blockwise_top_k, tile_shape
+
+
+def test_blockwise_top_k_matches_dense_search_under_a_tiny_budget():
+    rng = np.random.default_rng(3)
+    matrix = sparse.random(60, 12, density=0.3, random_state=4, format='csr', dtype=np.float32)
+    dense = normalize_rows(matrix).toarray()
+    similarities = dense @ dense.T
+    np.fill_diagonal(similarities, -np.inf)
+
+    # Budget for a handful of candidate columns per tile
+    budget = 60 * 16 * 8
+    assert tile_shape(60, 60, 5, budget)[1] < 60
+
+    positions, scores = blockwise_top_k(matrix, matrix, 5, exclude=np.arange(60), memory_budget=budget)
+
+    expected = -np.sort(-similarities, axis=1)[:, :5]
+    assert np.allclose(scores, expected, atol=1e-6)
+    assert not (positions == np.arange(60)[:, None]).any()
+    rows = rng.integers(0, 60, size=10)
+    for row in rows:
+        assert np.allclose(similarities[row, positions[row]], scores[row], atol=1e-6)
+
+
+def test_blockwise_top_k_pads_when_fewer_candidates_than_k():
+    matrix = sparse.csr_matrix(np.eye(2, dtype=np.float32))
+    positions, scores = blockwise_top_k(matrix, matrix, 5, exclude=np.arange(2))
+
+    assert positions.shape == (2, 2)
+    assert positions[:, 1].tolist() == [-1, -1]
+    assert np.isneginf(scores[:, 1]).all()
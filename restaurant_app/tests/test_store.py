@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from restaurant_app.models import FoodItem, OrderItem, Order
+from restaurant_app.store import InteractionStore, load_interactions
+
+
+@pytest.fixture
+def order_history():
+    User = get_user_model()
+    alice = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    bob = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+
+    order = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order, food_item=pizza, quantity=2, price=pizza.price)
+    OrderItem.objects.create(order=order, food_item=pasta, quantity=1, price=pasta.price)
+    return alice, bob, pizza, pasta
+
+
+@pytest.mark.django_db
+def test_append_only_copies_rows_above_the_watermark(order_history):
+    alice, bob, pizza, pasta = order_history
+    store = InteractionStore()
+
+    assert store.append_new(OrderItem, chunk_size=1) == 2
+    assert store.append_new(OrderItem) == 0
+
+    order = Order.objects.create(customer=bob, total_price=0)
+    item = OrderItem.objects.create(order=order, food_item=pizza, quantity=3, price=pizza.price)
+    assert store.append_new(OrderItem) == 1
+    assert store.meta == {'rows': 3, 'watermark': item.id}
+
+    columns = store.columns()
+    assert columns['user_ids'].dtype == np.int32
+    assert columns['quantities'].dtype == np.float32
+    assert columns['user_ids'].tolist() == [alice.id, alice.id, bob.id]
+    assert columns['item_ids'].tolist() == [pizza.id, pasta.id, pizza.id]
+    assert columns['quantities'].tolist() == [2.0, 1.0, 3.0]
+    assert (columns['timestamps'] > 0).all()
+
+
+@pytest.mark.django_db
+def test_interrupted_append_is_discarded_and_rebuild_drops_deleted_rows(order_history):
+    alice, bob, pizza, pasta = order_history
+    store = InteractionStore()
+    store.append_new(OrderItem)
+
+    # Half-written row past the committed count
+    with open(store._column_path('user_ids'), 'ab') as column:
+        np.array([99], dtype=np.int32).tofile(column)
+    order = Order.objects.create(customer=bob, total_price=0)
+    OrderItem.objects.create(order=order, food_item=pasta, quantity=1, price=pasta.price)
+    store.append_new(OrderItem)
+    assert store.columns(mmap=False)['user_ids'].tolist() == [alice.id, alice.id, bob.id]
+
+    OrderItem.objects.filter(food_item=pizza).delete()
+    call_command('sync_interaction_store', rebuild=True)
+    assert store.columns()['item_ids'].tolist() == [pasta.id, pasta.id]
+
+
+@pytest.mark.django_db
+def test_training_matrix_matches_the_orm(order_history):
+    alice, bob, pizza, pasta = order_history
+    order = Order.objects.create(customer=alice, total_price=0)
+    OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=pizza.price)
+
+    interactions = load_interactions(OrderItem)
+    row = interactions.user_index[alice.id]
+    assert interactions.matrix.toarray()[row].tolist() == [3.0, 1.0]
@@ -0,0 +1,52 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from restaurant_app.models import FoodItem, Order, OrderItem
+from restaurant_app.recommender import RestaurantRecommender
+from restaurant_app.trending import SlidingWindowCounter, get_trending_counter
+
+
+def test_counts_expire_once_their_minute_leaves_the_window():
+    counter = SlidingWindowCounter(window_minutes=5)
+    counter.record({1: 3, 2: 1}, timestamp=0)
+    counter.record({2: 4}, timestamp=120)
+
+    assert counter.top(2, timestamp=180) == [(2, 5), (1, 3)]
+    # Minute 0 is out of a 5-minute window at minute 5
+    assert counter.top(2, timestamp=300) == [(2, 4)]
+    # Reusing minute 2's slot for minute 7 drops its counts
+    counter.record({3: 1}, timestamp=420)
+    assert counter.top(5, timestamp=420) == [(3, 1)]
+
+
+def test_memory_is_bounded_by_the_window():
+    counter = SlidingWindowCounter(window_minutes=3)
+    for minute in range(100):
+        counter.record({minute: 1}, timestamp=minute * 60)
+
+    assert len(counter._buckets) == 3
+    assert sorted(item_id for item_id, _ in counter.top(10, timestamp=99 * 60)) == [97, 98, 99]
+
+
+@pytest.mark.django_db
+def test_orders_feed_the_trending_endpoint_and_strategy(django_capture_on_commit_callbacks):
+    User = get_user_model()
+    customer = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10.99)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12.99)
+
+    client = APIClient()
+    client.force_authenticate(user=customer)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/api/orders/', {
+            'items': [{'food_item': pasta.id, 'quantity': 1}, {'food_item': pizza.id, 'quantity': 3}],
+        }, format='json')
+    assert response.status_code == 201
+    assert get_trending_counter().top(2) == [(pizza.id, 3), (pasta.id, 1)]
+
+    response = client.get('/api/food-items/trending/?n=1')
+    assert [(item['id'], item['quantity']) for item in response.data] == [(pizza.id, 3)]
+
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    recommender = RestaurantRecommender(other, Order, OrderItem, FoodItem, strategies=['trending'])
+    assert recommender.get_recommendations() == [pizza.id, pasta.id]
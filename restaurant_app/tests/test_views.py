@@ -5,7 +5,12 @@ import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile 
 from PIL import Image
 import io
+from datetime import timedelta
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from restaurant_app.catalog import CATALOG_MODIFIED_KEY
 
 @pytest.fixture
 def client():
@@ -69,3 +74,123 @@ def test_get_food_items(client):
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) > 0
 
+
+@pytest.mark.django_db
+def test_similar_food_items(client):
+    User = get_user_model()
+    user = User.objects.create_user(username="testuser", email="testuser@example.com", password="password123")
+    client.force_authenticate(user=user)
+
+    margherita = FoodItem.objects.create(name="Margherita", description="Tomato cheese pizza", price=9.99, category="Italian")
+    pepperoni = FoodItem.objects.create(name="Pepperoni", description="Spicy cheese pizza", price=11.99, category="Italian")
+    FoodItem.objects.create(name="Salad", description="Green leaves", price=5.99, category="Healthy")
+    # Neighbours are only built offline
+    assert client.get(f'/api/food-items/{margherita.id}/similar/').data == []
+    call_command('build_item_neighbors')
+
+    response = client.get(f'/api/food-items/{margherita.id}/similar/')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]['id'] == pepperoni.id
+    assert response.data[0]['score'] > 0
+
+
+@pytest.mark.django_db
+def test_order_list_pages_with_constant_queries(client, django_assert_num_queries):
+    from restaurant_app.models import Order, OrderItem
+
+    User = get_user_model()
+    customer = User.objects.create_user(username="alice", email="alice@example.com", password="password123")
+    other = User.objects.create_user(username="bob", email="bob@example.com", password="password123")
+    pizza = FoodItem.objects.create(name="Pizza", description="Cheese pizza", price=10)
+    pasta = FoodItem.objects.create(name="Pasta", description="Creamy pasta", price=12)
+    order_ids = []
+    for _ in range(5):
+        order = Order.objects.create(customer=customer, total_price=22)
+        OrderItem.objects.create(order=order, food_item=pizza, quantity=1, price=10)
+        OrderItem.objects.create(order=order, food_item=pasta, quantity=1, price=12)
+        order_ids.append(order.id)
+    Order.objects.create(customer=other, total_price=0)
+
+    client.force_authenticate(user=customer)
+    seen = []
+    url = '/api/orders/?page_size=2'
+    while url:
+        # One query for the page, one for the prefetched items
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(order['id'] for order in response.data['results'])
+        assert all(len(order['items']) == 2 for order in response.data['results'])
+        url = response.data['next']
+
+    assert seen == order_ids[::-1]
+
+
+@pytest.mark.django_db
+def test_order_cursor_pages_through_orders_placed_at_the_same_time(client):
+    from restaurant_app.models import Order
+
+    customer = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    order_ids = [Order.objects.create(customer=customer, total_price=0).id for _ in range(5)]
+    Order.objects.filter(id__in=order_ids[1:4]).update(created_at=timezone.now())
+
+    client.force_authenticate(user=customer)
+    pages = []
+    url = '/api/orders/?page_size=2'
+    while url:
+        response = client.get(url)
+        pages.append([order['id'] for order in response.data['results']])
+        previous, url = response.data['previous'], response.data['next']
+
+    expected = [order_ids[3], order_ids[2], order_ids[1], order_ids[4], order_ids[0]]
+    assert sum(pages, []) == expected
+    assert [order['id'] for order in client.get(previous).data['results']] == expected[2:4]
+    assert client.get('/api/orders/?cursor=cD1ub3Bl').status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_catalog_reads_are_cached_per_version(client, django_assert_num_queries, django_capture_on_commit_callbacks):
+    user = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    client.force_authenticate(user=user)
+    burger = FoodItem.objects.create(name="Burger", description="Cheesy burger", price=8.99, category="American")
+
+    first = client.get('/api/food-items/')
+    etag = first['ETag']
+    assert first['Last-Modified']
+    with django_assert_num_queries(0):
+        assert client.get('/api/food-items/').data == first.data
+        detail = client.get(f'/api/food-items/{burger.id}/')
+        not_modified = client.get('/api/food-items/', HTTP_IF_NONE_MATCH=etag)
+    assert detail.data['name'] == "Burger"
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert client.get('/api/food-items/999999/').status_code == status.HTTP_404_NOT_FOUND
+
+    with django_capture_on_commit_callbacks(execute=True):
+        burger.price = 9.49
+        burger.save()
+    response = client.get('/api/food-items/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert response.data[0]['price'] == '9.49'
+
+
+@pytest.mark.django_db
+def test_deleting_an_item_moves_last_modified(client, django_capture_on_commit_callbacks):
+    user = get_user_model().objects.create_user(username="alice", email="alice@example.com", password="password123")
+    client.force_authenticate(user=user)
+    burger = FoodItem.objects.create(name="Burger", description="Cheesy burger", price=8.99, category="American")
+    FoodItem.objects.create(name="Fries", description="Salted fries", price=3.99, category="Sides")
+    # The catalog last changed an hour ago
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    FoodItem.objects.update(updated_at=an_hour_ago)
+    cache.set(CATALOG_MODIFIED_KEY, an_hour_ago)
+
+    last_modified = client.get('/api/food-items/')['Last-Modified']
+    assert client.get('/api/food-items/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+
+    with django_capture_on_commit_callbacks(execute=True):
+        burger.delete()
+    response = client.get('/api/food-items/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 1
@@ -0,0 +1,92 @@
+import heapq
+import threading
+import time
+
+from .conf import recommender_setting
+
+
+class SlidingWindowCounter:
+    """Item quantities sold over the last ``window_minutes`` minutes.
+
+    Sales go into a ring of per-minute buckets next to a running total per
+    item. A bucket is cleared (and subtracted from the totals) when its slot
+    is reused for a newer minute, so recording a sale is O(1) amortized,
+    ``top`` is O(items) and memory never exceeds one bucket per minute of
+    the window. Counts are per process.
+    """
+
+    def __init__(self, window_minutes=60):
+        self.window_minutes = window_minutes
+        self._buckets = [{} for _ in range(window_minutes)]
+        self._bucket_minutes = [None] * window_minutes
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def _advance(self, minute):
+        # Expire every slot holding a minute that fell out of the window
+        for slot, bucket_minute in enumerate(self._bucket_minutes):
+            if bucket_minute is not None and bucket_minute <= minute - self.window_minutes:
+                self._expire(slot)
+
+    def _expire(self, slot):
+        for item_id, quantity in self._buckets[slot].items():
+            remaining = self._totals[item_id] - quantity
+            if remaining > 0:
+                self._totals[item_id] = remaining
+            else:
+                del self._totals[item_id]
+        self._buckets[slot] = {}
+        self._bucket_minutes[slot] = None
+
+    def record(self, quantities, timestamp=None):
+        """Add ``{food_item_id: quantity}`` sold at ``timestamp`` (seconds, default now)."""
+        minute = int((time.time() if timestamp is None else timestamp) // 60)
+        slot = minute % self.window_minutes
+
+        with self._lock:
+            if self._bucket_minutes[slot] != minute:
+                if self._bucket_minutes[slot] is not None and self._bucket_minutes[slot] > minute:
+                    # Older than the minute already occupying the slot
+                    return
+                self._expire(slot)
+                self._bucket_minutes[slot] = minute
+
+            bucket = self._buckets[slot]
+            for item_id, quantity in quantities.items():
+                bucket[item_id] = bucket.get(item_id, 0) + quantity
+                self._totals[item_id] = self._totals.get(item_id, 0) + quantity
+
+    def top(self, n=10, timestamp=None):
+        """``(food_item_id, quantity)`` pairs of the ``n`` best sellers in the window."""
+        minute = int((time.time() if timestamp is None else timestamp) // 60)
+        with self._lock:
+            self._advance(minute)
+            return heapq.nlargest(n, self._totals.items(), key=lambda pair: (pair[1], -pair[0]))
+
+    def clear(self):
+        with self._lock:
+            self._buckets = [{} for _ in range(self.window_minutes)]
+            self._bucket_minutes = [None] * self.window_minutes
+            self._totals = {}
+
+
+_trending = None
+_trending_lock = threading.Lock()
+
+
+def get_trending_counter():
+    """Process-wide sliding window, sized by ``TRENDING_WINDOW_MINUTES``."""
+    global _trending
+
+    if _trending is None:
+        with _trending_lock:
+            if _trending is None:
+                _trending = SlidingWindowCounter(recommender_setting('TRENDING_WINDOW_MINUTES'))
+    return _trending
+
+
+def reset_trending_counter():
+    global _trending
+
+    with _trending_lock:
+        _trending = None
@@ -7,6 +7,7 @@ from .views import (
     FoodItemViewSet,
     OrderViewSet,
     RecommendationView,
+    RecommendationCacheStatsView,
 )
 
 from drf_yasg.views import get_schema_view
@@ -35,6 +36,7 @@ urlpatterns = [
     path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('recommendations/', RecommendationView.as_view(), name='recommendations'),
+    path('recommendations/cache-stats/', RecommendationCacheStatsView.as_view(), name='recommendation-cache-stats'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger-docs'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='redoc-docs'),
 ]
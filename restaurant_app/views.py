@@ -1,14 +1,32 @@
+from collections.abc import Iterator
+
 from rest_framework import viewsets, generics, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count
+from django.db.models import Case, Count, IntegerField, When
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from sklearn.preprocessing import StandardScaler
 import numpy as np
 from .utils import process_image
-from .recommender import RestaurantRecommender
+from .recommender import RestaurantRecommender, resolve_strategies
+from .neighbors import get_item_neighbors
+from .search import get_search_index
+from .baskets import bought_together
+from .catalog import get_catalog_index, get_catalog_snapshot
+from .interactions import windowed_order_items
+from .trending import get_trending_counter
+from .caches import recommendation_cache
+from .ingest import ingest_orders
+from .pagination import OrderCursorPagination
+from .parsers import NDJSONParser
 
-from .models import User, FoodItem, Order, OrderItem
+from .models import User, FoodItem, Order, OrderItem, PrecomputedRecommendation
 from .serializers import UserSerializer, FoodItemSerializer, OrderSerializer
 from .permissions import IsAdmin, IsCustomer
 
@@ -59,16 +77,115 @@ class FoodItemViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def get_catalog_snapshot(self):
+        return get_catalog_snapshot(
+            FoodItem,
+            lambda food_items: self.get_serializer(food_items, many=True).data,
+            base_url=self.request.build_absolute_uri('/')
+        )
+
+    def conditional_response(self, snapshot, data):
+        """``data`` with the snapshot's validators, or a 304 if the client's copy is current."""
+        last_modified = snapshot.last_modified and int(snapshot.last_modified.timestamp())
+        response = get_conditional_response(
+            self.request._request, etag=snapshot.etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(data)
+        response['ETag'] = snapshot.etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        snapshot = self.get_catalog_snapshot()
+        return self.conditional_response(snapshot, snapshot.rows)
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = self.get_catalog_snapshot()
+        try:
+            row = snapshot.by_id[int(kwargs['pk'])]
+        except (KeyError, ValueError):
+            raise Http404
+        return self.conditional_response(snapshot, row)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        food_item = self.get_object()
+        neighbor_ids, scores = get_item_neighbors(FoodItem, OrderItem).neighbors(food_item.id)
+
+        neighbors = FoodItem.objects.in_bulk(neighbor_ids.tolist())
+        data = []
+        for neighbor_id, score in zip(neighbor_ids.tolist(), scores.tolist()):
+            if neighbor_id in neighbors:
+                item_data = self.get_serializer(neighbors[neighbor_id]).data
+                item_data['score'] = score
+                data.append(item_data)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        try:
+            n = min(int(request.query_params.get('n', 10)), 100)
+        except ValueError:
+            raise ValidationError({'n': 'Must be an integer.'})
+
+        top = get_trending_counter().top(n)
+        food_items = FoodItem.objects.in_bulk([food_item_id for food_item_id, _ in top])
+        data = []
+        for food_item_id, quantity in top:
+            if food_item_id in food_items:
+                item_data = self.get_serializer(food_items[food_item_id]).data
+                item_data['quantity'] = quantity
+                data.append(item_data)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '')
+        if not query.strip():
+            raise ValidationError({'q': 'This parameter is required.'})
+        try:
+            n = min(int(request.query_params.get('n', 10)), 100)
+        except ValueError:
+            raise ValidationError({'n': 'Must be an integer.'})
+
+        matches = get_search_index(FoodItem).search(query, n)
+        rows = self.get_catalog_snapshot().by_id
+        data = []
+        for food_item_id, score in matches:
+            if food_item_id in rows:
+                item_data = dict(rows[food_item_id])
+                item_data['score'] = score
+                data.append(item_data)
+        return Response(data)
+
+    @action(detail=True, methods=['get'], url_path='bought-together')
+    def bought_together(self, request, pk=None):
+        food_item = self.get_object()
+        pairs = bought_together(food_item.id)
+
+        partners = FoodItem.objects.in_bulk([pair['food_item_id'] for pair in pairs])
+        data = []
+        for pair in pairs:
+            if pair['food_item_id'] in partners:
+                item_data = self.get_serializer(partners[pair['food_item_id']]).data
+                item_data.update({key: pair[key] for key in ('count', 'support', 'confidence', 'lift')})
+                data.append(item_data)
+        return Response(data)
+
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
+        queryset = Order.objects.prefetch_related('orderitem_set')
         if self.request.user.role == 'admin':
-            return Order.objects.all()
-        return Order.objects.filter(customer=self.request.user)
+            return queryset
+        return queryset.filter(customer=self.request.user)
 
     def get_permissions(self):
-        if self.action in ['update', 'partial_update']:
+        if self.action in ['update', 'partial_update', 'bulk']:
             permission_classes = [IsAdmin]
         elif self.action == 'create':
             permission_classes = [IsCustomer]
@@ -78,19 +195,101 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(customer=self.request.user)
+        recommendation_cache.invalidate(self.request.user.id)
+        PrecomputedRecommendation.objects.filter(user=self.request.user).delete()
+
+    @action(detail=False, methods=['post'], parser_classes=[NDJSONParser, JSONParser])
+    def bulk(self, request):
+        """Ingest a POS upload: a JSON array or NDJSON stream of orders."""
+        rows = request.data
+        if not isinstance(rows, (list, Iterator)):
+            raise ValidationError('Expected a JSON array or an NDJSON stream of orders.')
+
+        results = ingest_orders(rows)
+        created = sum('id' in result for result in results)
+        return Response({'created': created, 'failed': len(results) - created, 'results': results})
 
 
 class RecommendationView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FoodItemSerializer
+    strategy_timings = None
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.strategy_timings:
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={elapsed:.1f}' for name, elapsed in self.strategy_timings.items()
+            )
+        return response
+
+    def get_strategies(self):
+        """Strategy names from ``?strategies=a,b``, or None for the configured default."""
+        requested = self.request.query_params.get('strategies')
+        if not requested:
+            return None
+        try:
+            return resolve_strategies(name.strip() for name in requested.split(',') if name.strip())
+        except ValueError as error:
+            raise ValidationError({'strategies': str(error)})
+
+    def available(self, food_item_ids):
+        """``food_item_ids`` minus items since made unavailable or deleted."""
+        catalog = get_catalog_index(FoodItem)
+        keep = catalog.lookup(catalog.available, food_item_ids).tolist()
+        return [food_item_id for food_item_id, available in zip(food_item_ids, keep) if available]
 
     def get_queryset(self):
-        recommender = RestaurantRecommender(
-            user=self.request.user, 
-            Order=Order, 
-            OrderItem=OrderItem, 
-            FoodItem=FoodItem
+        strategies = self.get_strategies()
+        variant = ','.join(strategies) if strategies else ''
+        recommended_food_ids = recommendation_cache.get(self.request.user.id, variant)
+        cached = recommended_food_ids is not None
+
+        if not cached and strategies is None:
+            # Served from the offline precompute when there is a row for this
+            # user, computed against the current catalog
+            precomputed = (
+                PrecomputedRecommendation.objects
+                .filter(user=self.request.user)
+                .values_list('food_item_ids', 'catalog_fingerprint')
+                .first()
+            )
+            if precomputed and precomputed[1] == get_catalog_index(FoodItem).fingerprint:
+                recommended_food_ids = precomputed[0]
+
+        if recommended_food_ids is not None:
+            # Stored lists may predate a change to the catalog
+            recommended_food_ids = self.available(recommended_food_ids)
+        else:
+            recommender = RestaurantRecommender(
+                user=self.request.user, 
+                Order=Order, 
+                OrderItem=OrderItem, 
+                FoodItem=FoodItem,
+                strategies=strategies
+            )
+            recommended_food_ids = recommender.get_recommendations()
+            self.strategy_timings = recommender.timings
+
+        if not cached:
+            recommendation_cache.set(self.request.user.id, recommended_food_ids, variant)
+
+        if not recommended_food_ids:
+            return FoodItem.objects.none()
+
+        # Keep the ranked order
+        ranking = Case(
+            *[When(id=food_item_id, then=position) for position, food_item_id in enumerate(recommended_food_ids)],
+            output_field=IntegerField()
         )
-        
-        recommended_food_ids = recommender.get_recommendations()
-        return FoodItem.objects.filter(id__in=recommended_food_ids)
\ No newline at end of file
+        # Drop anything the user ordered since the list was stored, within
+        # the same query
+        ordered = windowed_order_items(OrderItem, customer_ids=[self.request.user.id]).values('food_item_id')
+        return FoodItem.objects.filter(id__in=recommended_food_ids).exclude(id__in=ordered).order_by(ranking)
+
+
+class RecommendationCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(recommendation_cache.stats())